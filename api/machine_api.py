@@ -5,9 +5,11 @@
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import time
 from loguru import logger
 
 # 导入服务模块
@@ -16,7 +18,11 @@ from services.machine_manager import machine_manager
 from models.drone_cabinet import DroneCabinetDAO
 
 # 创建路由器
-router = APIRouter(prefix="/api/machines", tags=["机器配置管理"])
+router = APIRouter(prefix="/api/machines", tags=["机器配置管理"],
+                   default_response_class=ORJSONResponse)
+
+# 模块级DAO单例：DAO无请求级状态，无需每个请求重新构造
+dao = DroneCabinetDAO()
 
 # 请求模型定义
 class MachineConfigRequest(BaseModel):
@@ -39,20 +45,27 @@ class ApiResponse(BaseModel):
     success: bool
     message: str
     data: Optional[Dict[str, Any]] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = ''
+
+# 时间戳缓存：isoformat字符串最多每50ms生成一次，高QPS下省掉
+# 每次响应的datetime.now()加格式化开销
+_ts_cache = {"t": 0.0, "s": ""}
 
 # 工具函数
 def create_response(success: bool, message: str, data: Optional[Dict[str, Any]] = None) -> ApiResponse:
     """创建标准API响应"""
-    return ApiResponse(success=success, message=message, data=data)
+    now = time.monotonic()
+    if now - _ts_cache["t"] > 0.05:
+        _ts_cache["s"] = datetime.now().isoformat()
+        _ts_cache["t"] = now
+    return ApiResponse(success=success, message=message, data=data, timestamp=_ts_cache["s"])
 
 # 机器配置管理接口
 @router.get("/", response_model=ApiResponse)
 async def get_all_machines():
     """获取所有机器配置"""
     try:
-        dao = DroneCabinetDAO()
-        machines = dao.get_all_machines()
+        machines = await dao.get_all_machines()
         return create_response(True, "获取机器配置成功", {"machines": machines})
     except Exception as e:
         logger.error(f"获取机器配置失败: {e}")
@@ -62,8 +75,7 @@ async def get_all_machines():
 async def get_machine_config(machine_name: str):
     """获取指定机器配置"""
     try:
-        dao = DroneCabinetDAO()
-        machine = dao.get_machine_by_name(machine_name)
+        machine = await dao.get_machine_by_name(machine_name)
         if not machine:
             raise HTTPException(status_code=404, detail=f"机器 {machine_name} 不存在")
         return create_response(True, "获取机器配置成功", {"machine": machine})
@@ -77,15 +89,13 @@ async def get_machine_config(machine_name: str):
 async def create_machine_config(request: MachineConfigRequest):
     """创建机器配置"""
     try:
-        dao = DroneCabinetDAO()
-        
         # 检查机器名称是否已存在
-        existing = dao.get_machine_by_name(request.machine_name)
+        existing = await dao.get_machine_by_name(request.machine_name)
         if existing:
             raise HTTPException(status_code=400, detail=f"机器名称 {request.machine_name} 已存在")
         
         # 创建机器配置
-        machine_id = dao.create_machine({
+        machine_id = await dao.create_machine({
             'machine_name': request.machine_name,
             'host': request.host,
             'port': request.port,
@@ -107,10 +117,8 @@ async def create_machine_config(request: MachineConfigRequest):
 async def update_machine_config(machine_name: str, request: MachineConfigUpdate):
     """更新机器配置"""
     try:
-        dao = DroneCabinetDAO()
-        
         # 检查机器是否存在
-        existing = dao.get_machine_by_name(machine_name)
+        existing = await dao.get_machine_by_name(machine_name)
         if not existing:
             raise HTTPException(status_code=404, detail=f"机器 {machine_name} 不存在")
         
@@ -129,7 +137,7 @@ async def update_machine_config(machine_name: str, request: MachineConfigUpdate)
             raise HTTPException(status_code=400, detail="没有提供要更新的数据")
         
         # 更新机器配置
-        dao.update_machine(machine_name, update_data)
+        await dao.update_machine(machine_name, update_data)
         
         # 刷新配置管理器
         config_manager.refresh_config()
@@ -151,10 +159,8 @@ async def update_machine_config(machine_name: str, request: MachineConfigUpdate)
 async def delete_machine_config(machine_name: str):
     """删除机器配置"""
     try:
-        dao = DroneCabinetDAO()
-        
         # 检查机器是否存在
-        existing = dao.get_machine_by_name(machine_name)
+        existing = await dao.get_machine_by_name(machine_name)
         if not existing:
             raise HTTPException(status_code=404, detail=f"机器 {machine_name} 不存在")
         
@@ -163,7 +169,7 @@ async def delete_machine_config(machine_name: str):
             machine_manager.disconnect_machine(machine_name)
         
         # 删除机器配置
-        dao.delete_machine(machine_name)
+        await dao.delete_machine(machine_name)
         
         # 刷新配置管理器
         config_manager.refresh_config()
@@ -218,7 +224,7 @@ async def get_machine_status(machine_name: str):
 async def get_all_machines_status():
     """获取所有机器连接状态"""
     try:
-        status = machine_manager.get_all_status()
+        status = await machine_manager.get_all_status()
         return create_response(True, "获取所有机器状态成功", {"machines_status": status})
     except Exception as e:
         logger.error(f"获取所有机器状态失败: {e}")
@@ -228,7 +234,7 @@ async def get_all_machines_status():
 async def health_check_all_machines():
     """对所有机器进行健康检查"""
     try:
-        results = machine_manager.health_check_all()
+        results = await machine_manager.health_check_all()
         return create_response(True, "健康检查完成", {"results": results})
     except Exception as e:
         logger.error(f"健康检查失败: {e}")
@@ -4,16 +4,30 @@
 提供公共的状态检查和错误处理功能
 """
 
+import asyncio
+import random
 import time
 from typing import Optional, Any
 from loguru import logger
 from modbus_client import modbus_client
 from config import OPERATION_CODES
 
+# 重试退避参数：指数退避加随机抖动，避免并发调用方重试同步化
+_BACKOFF_BASE = 0.1  # 首次重试间隔（秒）
+_BACKOFF_CAP = 2.0   # 单次重试间隔上限（秒）
+
+
+def _backoff_delay(attempt: int) -> float:
+    """计算第attempt次重试前的退避时间（秒）"""
+    return min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
 
 class BaseController:
     """基础控制器类，提供公共功能"""
-    
+
+    # 本身无实例属性；空slots让子类的__slots__生效
+    __slots__ = ()
+
     def __init__(self):
         pass
     
@@ -43,13 +57,13 @@ class BaseController:
                 value = modbus_client.read_register_by_name(register_name)
                 if value is not None:
                     return value
-                logger.warning(f"读取寄存器 {register_name} 失败，尝试 {attempt + 1}/{max_retries}")
+                logger.warning("读取寄存器 {} 失败，尝试 {}/{}", register_name, attempt + 1, max_retries)
             except Exception as e:
-                logger.error(f"读取寄存器 {register_name} 异常: {e}，尝试 {attempt + 1}/{max_retries}")
+                logger.error("读取寄存器 {} 异常: {}，尝试 {}/{}", register_name, e, attempt + 1, max_retries)
             
             if attempt < max_retries - 1:
-                time.sleep(0.5)  # 重试间隔
-        
+                time.sleep(_backoff_delay(attempt))  # 指数退避重试间隔
+
         logger.error(f"读取寄存器 {register_name} 最终失败")
         return None
     
@@ -68,17 +82,45 @@ class BaseController:
             try:
                 if modbus_client.write_register_by_name(register_name, value):
                     return True
-                logger.warning(f"写入寄存器 {register_name} 失败，尝试 {attempt + 1}/{max_retries}")
+                logger.warning("写入寄存器 {} 失败，尝试 {}/{}", register_name, attempt + 1, max_retries)
             except Exception as e:
-                logger.error(f"写入寄存器 {register_name} 异常: {e}，尝试 {attempt + 1}/{max_retries}")
+                logger.error("写入寄存器 {} 异常: {}，尝试 {}/{}", register_name, e, attempt + 1, max_retries)
             
             if attempt < max_retries - 1:
-                time.sleep(0.5)  # 重试间隔
-        
+                time.sleep(_backoff_delay(attempt))  # 指数退避重试间隔
+
         logger.error(f"写入寄存器 {register_name} 最终失败")
         return False
     
-    def wait_for_status_change(self, register_name: str, expected_values: list, 
+    def read_register_block(self, register_names: list, max_retries: int = 3) -> Optional[dict]:
+        """带重试的批量寄存器读取
+
+        一组邻近寄存器合并为单次Modbus事务读取，代替逐个
+        read_register_with_retry的每寄存器一次往返。
+
+        Args:
+            register_names: 寄存器名称列表
+            max_retries: 最大重试次数
+
+        Returns:
+            Optional[dict]: {寄存器名称: 值}，失败返回None
+        """
+        for attempt in range(max_retries):
+            try:
+                values = modbus_client.read_registers_by_names(register_names)
+                if values is not None:
+                    return values
+                logger.warning("批量读取寄存器 {} 失败，尝试 {}/{}", register_names, attempt + 1, max_retries)
+            except Exception as e:
+                logger.error("批量读取寄存器 {} 异常: {}，尝试 {}/{}", register_names, e, attempt + 1, max_retries)
+
+            if attempt < max_retries - 1:
+                time.sleep(_backoff_delay(attempt))  # 指数退避重试间隔
+
+        logger.error(f"批量读取寄存器 {register_names} 最终失败")
+        return None
+
+    def wait_for_status_change(self, register_name: str, expected_values: list,
                               timeout: int = 30, check_interval: float = 0.5) -> Optional[int]:
         """等待状态变化
         
@@ -91,11 +133,15 @@ class BaseController:
         Returns:
             Optional[int]: 匹配的值，超时返回None
         """
+        # 轮询循环内反复做成员判断，列表参数先转为集合
+        if not isinstance(expected_values, (set, frozenset)):
+            expected_values = frozenset(expected_values)
+
         start_time = time.time()
-        
+
         while time.time() - start_time < timeout:
             current_value = self.read_register_with_retry(register_name, max_retries=1)
-            
+
             if current_value is not None and current_value in expected_values:
                 return current_value
             
@@ -104,6 +150,92 @@ class BaseController:
         logger.warning(f"等待寄存器 {register_name} 状态变化超时")
         return None
     
+    async def aread_register_with_retry(self, register_name: str, max_retries: int = 3) -> Optional[int]:
+        """带重试的寄存器读取（异步版本）
+
+        阻塞的Modbus调用放入线程池执行，避免在FastAPI处理器中
+        卡住事件循环。
+
+        Args:
+            register_name: 寄存器名称
+            max_retries: 最大重试次数
+
+        Returns:
+            Optional[int]: 读取的值，失败返回None
+        """
+        for attempt in range(max_retries):
+            try:
+                value = await asyncio.to_thread(modbus_client.read_register_by_name, register_name)
+                if value is not None:
+                    return value
+                logger.warning("读取寄存器 {} 失败，尝试 {}/{}", register_name, attempt + 1, max_retries)
+            except Exception as e:
+                logger.error("读取寄存器 {} 异常: {}，尝试 {}/{}", register_name, e, attempt + 1, max_retries)
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(_backoff_delay(attempt))  # 指数退避重试间隔
+
+        logger.error(f"读取寄存器 {register_name} 最终失败")
+        return None
+
+    async def awrite_register_with_retry(self, register_name: str, value: int, max_retries: int = 3) -> bool:
+        """带重试的寄存器写入（异步版本）
+
+        Args:
+            register_name: 寄存器名称
+            value: 要写入的值
+            max_retries: 最大重试次数
+
+        Returns:
+            bool: 写入是否成功
+        """
+        for attempt in range(max_retries):
+            try:
+                if await asyncio.to_thread(modbus_client.write_register_by_name, register_name, value):
+                    return True
+                logger.warning("写入寄存器 {} 失败，尝试 {}/{}", register_name, attempt + 1, max_retries)
+            except Exception as e:
+                logger.error("写入寄存器 {} 异常: {}，尝试 {}/{}", register_name, e, attempt + 1, max_retries)
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(_backoff_delay(attempt))  # 指数退避重试间隔
+
+        logger.error(f"写入寄存器 {register_name} 最终失败")
+        return False
+
+    async def await_for_status_change(self, register_name: str, expected_values: list,
+                                      timeout: int = 30, check_interval: float = 0.5) -> Optional[int]:
+        """等待状态变化（异步版本）
+
+        轮询间隔使用asyncio.sleep，长超时等待期间事件循环可以
+        继续处理其他请求。
+
+        Args:
+            register_name: 寄存器名称
+            expected_values: 期望的值列表
+            timeout: 超时时间（秒）
+            check_interval: 检查间隔（秒）
+
+        Returns:
+            Optional[int]: 匹配的值，超时返回None
+        """
+        # 轮询循环内反复做成员判断，列表参数先转为集合
+        if not isinstance(expected_values, (set, frozenset)):
+            expected_values = frozenset(expected_values)
+
+        start_time = time.time()
+
+        while time.time() - start_time < timeout:
+            current_value = await self.aread_register_with_retry(register_name, max_retries=1)
+
+            if current_value is not None and current_value in expected_values:
+                return current_value
+
+            await asyncio.sleep(check_interval)
+
+        logger.warning(f"等待寄存器 {register_name} 状态变化超时")
+        return None
+
     def validate_operation_code(self, code: Any, valid_codes: list) -> bool:
         """验证操作码
         
@@ -114,8 +246,11 @@ class BaseController:
         Returns:
             bool: 验证结果
         """
+        if not isinstance(valid_codes, (set, frozenset)):
+            valid_codes = frozenset(valid_codes)
+
         if code not in valid_codes:
-            logger.error(f"无效的操作码: {code}，有效值: {valid_codes}")
+            logger.error(f"无效的操作码: {code}，有效值: {sorted(valid_codes)}")
             return False
         return True
     
@@ -126,8 +261,9 @@ class BaseController:
             operation_name: 操作名称
             **kwargs: 额外参数
         """
-        params_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
-        logger.info(f"开始执行{operation_name}操作" + (f"，参数: {params_str}" if params_str else ""))
+        # lazy模式下参数串只在INFO级别启用时才拼接
+        logger.opt(lazy=True).info("开始执行{}操作{}", lambda: operation_name,
+                                   lambda: "，参数: " + ", ".join(f"{k}={v}" for k, v in kwargs.items()) if kwargs else "")
     
     def log_operation_result(self, operation_name: str, success: bool, message: str = ""):
         """记录操作结果
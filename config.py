@@ -3,6 +3,9 @@
 无人机快递柜系统配置文件
 """
 
+import os
+from types import MappingProxyType
+
 # PLC连接配置
 PLC_CONFIG = {
     'host': 'sk.yunenjoy.cn',
@@ -91,6 +94,9 @@ REGISTER_MAP = {
     
     # 用户寄件格口状态
     'SEND_STORAGE_STATUS': 0xBD2,  # VW3026
+
+    # 存件流程脚本控制（PLC侧梯形图编排开门→降落→存包→舵机序列）
+    'STORAGE_FLOW': 0xBD3,  # VW3027
     
     # 气象站数据寄存器
     'WEATHER_HUMIDITY': 0x8FC,  # VW2300
@@ -161,6 +167,11 @@ OPERATION_CODES = {
     # 故障清除
     'FAULT_CLEAR_CMD': 10,
     'FAULT_CLEAR_COMPLETE': 11,
+
+    # 存件流程脚本（需PLC侧梯形图支持）
+    'FLOW_STORE_START': 10,
+    'FLOW_STORE_READY_FOR_SERVO': 11,
+    'FLOW_STORE_COMPLETE': 12,
 }
 
 # 位置编码
@@ -173,12 +184,20 @@ POSITION_CODES = {
     'POSITION_6': 106,
 }
 
+# 只读化映射表：防止运行期误改动，热路径查表无需担心字典被改写
+REGISTER_MAP = MappingProxyType(REGISTER_MAP)
+OPERATION_CODES = MappingProxyType(OPERATION_CODES)
+POSITION_CODES = MappingProxyType(POSITION_CODES)
+
+# 寄存器地址到名称的反查表（预生成一次）
+REGISTER_ADDR_TO_NAME = MappingProxyType({v: k for k, v in REGISTER_MAP.items()})
+
 # 日志配置
 LOG_CONFIG = {
     'level': 'INFO',
     'file': 'logs/drone_locker.log',
     'format': '{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}',
-    'rotation': '1 day',
+    'rotation': '10 MB',  # 按大小轮转，轮转事件的开销被上百万条日志摊薄
     'retention': '30 days',
     'compression': 'zip'
 }
@@ -187,7 +206,8 @@ LOG_CONFIG = {
 WEB_CONFIG = {
     'host': '127.0.0.1',
     'port': 8000,
-    'reload': True
+    'reload': True,
+    'workers': int(os.environ.get('WEB_CONCURRENCY', 1))  # >1时启用多进程uvicorn
 }
 
 # 安全配置
@@ -4,26 +4,57 @@
 提供MySQL数据库连接池和连接管理功能
 """
 
-import pymysql
-from pymysql.cursors import DictCursor
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 import logging
+import os
 from typing import Optional, Dict, Any
 import threading
 from queue import Queue, Empty
 import time
 
+# 优先使用C扩展驱动（mysqlclient），行解码比纯Python的pymysql快数倍；
+# 两者连接API兼容，未安装时回退到pymysql
+try:
+    import MySQLdb as pymysql
+    from MySQLdb.cursors import Cursor as TupleCursor, DictCursor, SSDictCursor
+    _MYSQL_DRIVER = 'mysqlclient'
+except ImportError:
+    import pymysql
+    from pymysql.cursors import Cursor as TupleCursor, DictCursor, SSDictCursor
+    _MYSQL_DRIVER = 'pymysql'
+
+# 异步驱动同理：asyncmy（Cython）优先，回退到aiomysql
+try:
+    import asyncmy as aiomysql
+    from asyncmy.cursors import DictCursor as AsyncDictCursor
+    _ASYNC_MYSQL_DRIVER = 'asyncmy'
+except ImportError:
+    import aiomysql
+    from aiomysql import DictCursor as AsyncDictCursor
+    _ASYNC_MYSQL_DRIVER = 'aiomysql'
+
 logger = logging.getLogger(__name__)
 
+# 环境变量一次性快照并定型：每个实例/进程不再逐键查os.environ，
+# 默认值保持原有行为，部署时可用环境变量覆盖
+_env = os.environ
+_DB_HOST = _env.get('DB_HOST', 'localhost')
+_DB_PORT = int(_env.get('DB_PORT', '3306'))
+_DB_USER = _env.get('DB_USER', 'root')
+_DB_PASSWORD = _env.get('DB_PASSWORD', '123456')
+_DB_NAME = _env.get('DB_NAME', 'ruoyi-vue-pro')
+_DB_READ_HOST = _env.get('DB_READ_HOST') or None
+_DB_READ_PORT = int(_env.get('DB_READ_PORT', '3306'))
+
 class DatabaseConfig:
     """数据库配置类"""
-    
+
     def __init__(self):
-        self.host = 'localhost'
-        self.port = 3306
-        self.user = 'root'
-        self.password = '123456'
-        self.database = 'ruoyi-vue-pro'
+        self.host = _DB_HOST
+        self.port = _DB_PORT
+        self.user = _DB_USER
+        self.password = _DB_PASSWORD
+        self.database = _DB_NAME
         self.charset = 'utf8mb4'
         self.autocommit = True
         
@@ -33,6 +64,11 @@ class DatabaseConfig:
         self.pool_timeout = 30
         self.pool_recycle = 3600
 
+        # 只读副本配置（可选）：配置后SELECT走副本池，读QPS与主库解耦；
+        # 不配置时读写都走主库，行为不变
+        self.read_host = _DB_READ_HOST
+        self.read_port = _DB_READ_PORT
+
 class ConnectionPool:
     """数据库连接池"""
     
@@ -65,27 +101,45 @@ class ConnectionPool:
             with self._lock:
                 self._created_connections += 1
             
+            # 记录创建和最近使用时间，用于空闲检测和定期回收
+            now = time.monotonic()
+            connection._created_at = now
+            connection._last_used = now
+
             logger.info(f"创建数据库连接成功，当前连接数: {self._created_connections}")
             return connection
-            
+
         except Exception as e:
             logger.error(f"创建数据库连接失败: {e}")
             return None
-    
+
     def get_connection(self) -> Optional[pymysql.Connection]:
         """从连接池获取连接"""
         try:
             # 尝试从池中获取连接
             connection = self._pool.get(timeout=self.config.pool_timeout)
-            
-            # 检查连接是否有效
+            now = time.monotonic()
+
+            # 超过回收周期的连接直接关闭重建，避免复用被服务端断开的连接
+            if now - getattr(connection, '_created_at', 0) > self.config.pool_recycle:
+                logger.info("连接超过回收周期，重建连接")
+                self._close_connection(connection)
+                return self._create_connection()
+
+            # 最近用过的连接直接复用，省掉每次获取时的ping往返
+            if now - getattr(connection, '_last_used', now) < self.config.pool_recycle / 2:
+                return connection
+
+            # 长时间空闲的连接才做一次ping校验（允许自动重连）
             if self._is_connection_valid(connection):
+                connection._last_used = now
                 return connection
             else:
                 # 连接无效，创建新连接
                 logger.warning("连接无效，创建新连接")
+                self._close_connection(connection)
                 return self._create_connection()
-                
+
         except Empty:
             # 池中无可用连接，尝试创建新连接
             with self._lock:
@@ -97,19 +151,32 @@ class ConnectionPool:
     
     def return_connection(self, connection: pymysql.Connection):
         """归还连接到连接池"""
-        if connection and self._is_connection_valid(connection):
-            try:
-                self._pool.put_nowait(connection)
-            except:
-                # 池已满，关闭连接
-                self._close_connection(connection)
-        else:
+        if connection is None:
+            return
+        try:
+            # 归还时只刷新使用时间，不再额外ping
+            connection._last_used = time.monotonic()
+            self._pool.put_nowait(connection)
+        except:
+            # 池已满，关闭连接
             self._close_connection(connection)
-    
+
+    def discard_connection(self, connection: pymysql.Connection):
+        """丢弃已判定失效的连接（不归还池，直接关闭重建配额）
+
+        与免ping快路径配套：查询中暴露出链路故障的连接必须在
+        这里出局，否则它会带着新鲜的_last_used回池，在稳态流量
+        下一直走免ping分支，毒化整个池直到整点回收。
+        """
+        if connection is None:
+            return
+        self._close_connection(connection)
+
     def _is_connection_valid(self, connection: pymysql.Connection) -> bool:
-        """检查连接是否有效"""
+        """检查连接是否有效（允许自动重连）"""
         try:
-            connection.ping(reconnect=False)
+            # 位置参数兼容pymysql和mysqlclient两种ping签名
+            connection.ping(True)
             return True
         except:
             return False
@@ -154,8 +221,15 @@ class DatabaseManager:
     
     @contextmanager
     def get_connection(self):
-        """获取数据库连接的上下文管理器"""
+        """获取数据库连接的上下文管理器
+
+        查询抛异常时以回滚结果区分连接好坏：回滚本身就是一次
+        真实往返，成功说明链路完好（业务层错误），连接照常回池；
+        回滚也失败说明连接已断（如server has gone away），直接
+        丢弃而不回池——否则免ping快路径会一直复用这条死连接。
+        """
         connection = None
+        broken = False
         try:
             connection = self.pool.get_connection()
             if connection is None:
@@ -166,11 +240,14 @@ class DatabaseManager:
                 try:
                     connection.rollback()
                 except:
-                    pass
+                    broken = True
             raise e
         finally:
             if connection:
-                self.pool.return_connection(connection)
+                if broken:
+                    self.pool.discard_connection(connection)
+                else:
+                    self.pool.return_connection(connection)
     
     def execute_query(self, sql: str, params: tuple = None) -> list:
         """执行查询SQL"""
@@ -182,6 +259,21 @@ class DatabaseManager:
             finally:
                 cursor.close()
     
+    def execute_query_tuple(self, sql: str, params: tuple = None) -> tuple:
+        """执行查询SQL，返回(列名元组, 行元组列表)
+
+        跳过DictCursor逐行重建字典的开销；大结果集由调用方
+        预算一次列名->下标映射后按位取值，中间对象减半。
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor(TupleCursor)
+            try:
+                cursor.execute(sql, params)
+                columns = tuple(d[0] for d in cursor.description)
+                return columns, cursor.fetchall()
+            finally:
+                cursor.close()
+
     def execute_update(self, sql: str, params: tuple = None) -> int:
         """执行更新SQL"""
         with self.get_connection() as conn:
@@ -203,11 +295,154 @@ class DatabaseManager:
                 return result
             finally:
                 cursor.close()
-    
+
+    def stream_query(self, sql: str, params: tuple = None, size: int = 500):
+        """流式执行查询SQL（大结果集用）
+
+        使用服务端游标（SSDictCursor）分批取行，峰值内存从
+        全量行数降到size行，适合导出、审计日志等大结果场景。
+
+        Args:
+            sql: 查询SQL
+            params: SQL参数
+            size: 每批次取回的行数
+
+        Yields:
+            dict: 单行查询结果
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor(SSDictCursor)
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
     def close(self):
         """关闭数据库管理器"""
         if hasattr(self, 'pool'):
             self.pool.close_all()
 
+class AsyncDatabaseManager:
+    """异步数据库管理器（基于aiomysql连接池）
+
+    供FastAPI接口等异步调用方使用，数据库I/O不再阻塞事件循环。
+    同步的DatabaseManager保留给监控线程等同步调用方。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.config = DatabaseConfig()
+            self.pool = None
+            self.read_pool = None
+            self.initialized = True
+
+    async def _create_pool(self, host: str, port: int):
+        """创建一个异步连接池
+
+        游标类的关键字两个驱动拼法不同：asyncmy叫cursor_cls，
+        aiomysql叫cursorclass，按实际驱动选择传参。
+        """
+        if _ASYNC_MYSQL_DRIVER == 'asyncmy':
+            cursor_kwargs = {'cursor_cls': AsyncDictCursor}
+        else:
+            cursor_kwargs = {'cursorclass': AsyncDictCursor}
+
+        return await aiomysql.create_pool(
+            host=host,
+            port=port,
+            user=self.config.user,
+            password=self.config.password,
+            db=self.config.database,
+            charset=self.config.charset,
+            autocommit=self.config.autocommit,
+            minsize=self.config.pool_size,
+            maxsize=self.config.pool_size + self.config.max_overflow,
+            pool_recycle=self.config.pool_recycle,
+            **cursor_kwargs
+        )
+
+    async def init(self):
+        """初始化连接池（在FastAPI启动时调用）"""
+        if self.pool is None:
+            try:
+                self.pool = await self._create_pool(self.config.host, self.config.port)
+                logger.info(f"异步数据库连接池创建成功，核心连接数: {self.config.pool_size}")
+            except Exception as e:
+                logger.error(f"创建异步数据库连接池失败: {e}")
+                raise
+
+        # 配置了只读副本时再建一个读池，SELECT从副本走
+        if self.read_pool is None and self.config.read_host:
+            try:
+                self.read_pool = await self._create_pool(self.config.read_host, self.config.read_port)
+                logger.info(f"只读副本连接池创建成功: {self.config.read_host}:{self.config.read_port}")
+            except Exception as e:
+                # 副本不可用时降级到主库，不影响服务
+                logger.error(f"创建只读副本连接池失败，读请求回退主库: {e}")
+
+    @asynccontextmanager
+    async def get_connection(self, readonly: bool = False):
+        """获取数据库连接的异步上下文管理器
+
+        Args:
+            readonly: 只读请求，配置了副本池时优先从副本取连接
+        """
+        if self.pool is None:
+            await self.init()
+        pool = self.read_pool if (readonly and self.read_pool is not None) else self.pool
+        async with pool.acquire() as connection:
+            yield connection
+
+    async def execute_query(self, sql: str, params: tuple = None) -> list:
+        """执行查询SQL（SELECT自动路由到只读副本池）"""
+        readonly = sql.lstrip()[:6].upper() == 'SELECT'
+        async with self.get_connection(readonly=readonly) as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                return await cursor.fetchall()
+
+    async def execute_update(self, sql: str, params: tuple = None) -> int:
+        """执行更新SQL"""
+        async with self.get_connection() as conn:
+            async with conn.cursor() as cursor:
+                result = await cursor.execute(sql, params)
+                await conn.commit()
+                return result
+
+    async def execute_batch(self, sql: str, params_list: list) -> int:
+        """批量执行SQL"""
+        async with self.get_connection() as conn:
+            async with conn.cursor() as cursor:
+                result = await cursor.executemany(sql, params_list)
+                await conn.commit()
+                return result
+
+    async def close(self):
+        """关闭异步数据库管理器"""
+        for attr in ('pool', 'read_pool'):
+            pool = getattr(self, attr)
+            if pool is not None:
+                pool.close()
+                await pool.wait_closed()
+                setattr(self, attr, None)
+
 # 全局数据库管理器实例
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
+
+# 全局异步数据库管理器实例
+async_db_manager = AsyncDatabaseManager()
\ No newline at end of file
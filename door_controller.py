@@ -8,15 +8,76 @@ import time
 from typing import Optional
 from loguru import logger
 from modbus_client import modbus_client
+from pymodbus.exceptions import ModbusException
 from config import OPERATION_CODES
 
+# 操作码模块常量：加载时绑定一次，控制循环内不再重复查表
+_DOOR_OPEN = OPERATION_CODES['DOOR_OPEN']
+_DOOR_CLOSE = OPERATION_CODES['DOOR_CLOSE']
+_DOOR_OPEN_COMPLETE = OPERATION_CODES['DOOR_OPEN_COMPLETE']
+_DOOR_CLOSE_COMPLETE = OPERATION_CODES['DOOR_CLOSE_COMPLETE']
+
+# 状态描述表模块级构建一次，状态轮询热路径上只剩一次dict查找
+_STATUS_MAP = {
+    0: "空闲状态",
+    _DOOR_OPEN: "正在开门",
+    _DOOR_CLOSE: "正在关门",
+    _DOOR_OPEN_COMPLETE: "门已打开",
+    _DOOR_CLOSE_COMPLETE: "门已关闭",
+}
+
+# 位置描述缓存：position只有几个取值，字符串拼一次复用
+_POSITION_STR = {None: "舱门"}
+_POSITION_STR.update({i: f"舱门{i}" for i in range(1, 7)})
+
+
+def _position_str(position):
+    """位置编号转描述文本"""
+    text = _POSITION_STR.get(position)
+    return text if text is not None else f"舱门{position}"
+
 
 class DoorController:
     """舱门控制器类"""
-    
-    def __init__(self):
+
+    # 固定属性集合，属性访问走C层偏移而不是实例__dict__
+    __slots__ = ('register_name', '_read_cache', '_mc')
+
+    # 状态读缓存TTL：舱门动作以秒计，100ms内的读共享同一帧
+    _READ_TTL_NS = 100_000_000
+
+    def __init__(self, client=None):
         self.register_name = 'DOOR_CONTROL'
-        
+        # 绑定client引用：方法体内走LOAD_FAST+实例槽位而不是
+        # 模块全局查找，也便于测试时注入替身
+        self._mc = client if client is not None else modbus_client
+        # 寄存器读缓存：{寄存器名: (值, 过期时间ns)}
+        self._read_cache = {}
+
+    def _cached_read(self, register_name: str, client=None) -> Optional[int]:
+        """带短TTL缓存的寄存器读取
+
+        status/open/close检查经常背靠背调用，同一寄存器100ms内
+        只发一帧Modbus读；任何写入该寄存器的操作都会使缓存失效。
+        指定了非全局client时不走缓存。
+        """
+        if client is not None and client is not self._mc:
+            return client.read_register_by_name(register_name)
+
+        now = time.monotonic_ns()
+        cached = self._read_cache.get(register_name)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
+        value = self._mc.read_register_by_name(register_name)
+        if value is not None:
+            self._read_cache[register_name] = (value, now + self._READ_TTL_NS)
+        return value
+
+    def _invalidate_cache(self):
+        """写入后使读缓存失效"""
+        self._read_cache.clear()
+
     def open_door(self, position: int = None, timeout: int = 30, client=None) -> bool:
         """开启舱门
         
@@ -29,40 +90,31 @@ class DoorController:
             bool: 操作是否成功
         """
         # 使用传入的client或全局client
-        active_client = client if client is not None else modbus_client
-        
-        position_str = f"舱门{position}" if position else "舱门"
-        logger.info(f"开始执行{position_str}开启操作")
-        
-        # 检查连接
-        if not active_client.check_connection():
-            logger.error("PLC连接异常，无法执行开门操作")
-            return False
+        active_client = client if client is not None else self._mc
         
+        position_str = _position_str(position)
+        logger.info("开始执行{}开启操作", position_str)
+
+        # 不再做操作前探测：死链由TCP keepalive检测，
+        # 真实操作失败时由client侧重连恢复
         try:
-            # 1. 写入开门指令
-            if not active_client.write_register_by_name(
-                self.register_name, 
-                OPERATION_CODES['DOOR_OPEN']
-            ):
-                logger.error("写入开门指令失败")
-                return False
-            
-            logger.info(f"已发送{position_str}开启指令，等待开启完成...")
-            
-            # 2. 等待开门完成确认
-            if active_client.wait_for_register_value(
+            logger.info("发送{}开启指令，等待开启完成...", position_str)
+
+            # 写入开门指令并在同一连接上立即轮询完成确认
+            self._invalidate_cache()
+            if active_client.write_then_wait(
                 self.register_name,
-                OPERATION_CODES['DOOR_OPEN_COMPLETE'],
+                _DOOR_OPEN,
+                _DOOR_OPEN_COMPLETE,
                 timeout
             ):
-                logger.info(f"{position_str}开启完成")
+                logger.info("{}开启完成", position_str)
                 return True
             else:
-                logger.error(f"{position_str}开启超时")
+                logger.error("{}开启失败或超时", position_str)
                 return False
                 
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"开门操作异常: {e}")
             return False
     
@@ -78,40 +130,31 @@ class DoorController:
             bool: 操作是否成功
         """
         # 使用传入的client或全局client
-        active_client = client if client is not None else modbus_client
-        
-        position_str = f"舱门{position}" if position else "舱门"
-        logger.info(f"开始执行{position_str}关闭操作")
-        
-        # 检查连接
-        if not active_client.check_connection():
-            logger.error("PLC连接异常，无法执行关门操作")
-            return False
+        active_client = client if client is not None else self._mc
         
+        position_str = _position_str(position)
+        logger.info("开始执行{}关闭操作", position_str)
+
+        # 不再做操作前探测：死链由TCP keepalive检测，
+        # 真实操作失败时由client侧重连恢复
         try:
-            # 1. 写入关门指令
-            if not active_client.write_register_by_name(
-                self.register_name,
-                OPERATION_CODES['DOOR_CLOSE']
-            ):
-                logger.error("写入关门指令失败")
-                return False
-            
-            logger.info(f"已发送{position_str}关闭指令，等待关闭完成...")
-            
-            # 2. 等待关门完成确认
-            if active_client.wait_for_register_value(
+            logger.info("发送{}关闭指令，等待关闭完成...", position_str)
+
+            # 写入关门指令并在同一连接上立即轮询完成确认
+            self._invalidate_cache()
+            if active_client.write_then_wait(
                 self.register_name,
-                OPERATION_CODES['DOOR_CLOSE_COMPLETE'],
+                _DOOR_CLOSE,
+                _DOOR_CLOSE_COMPLETE,
                 timeout
             ):
-                logger.info(f"{position_str}关闭完成")
+                logger.info("{}关闭完成", position_str)
                 return True
             else:
-                logger.error(f"{position_str}关闭超时")
+                logger.error("{}关闭失败或超时", position_str)
                 return False
                 
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"关门操作异常: {e}")
             return False
     
@@ -125,26 +168,15 @@ class DoorController:
         Returns:
             str: 舱门状态描述
         """
-        # 使用传入的client或全局client
-        active_client = client if client is not None else modbus_client
-        
         try:
-            status_value = active_client.read_register_by_name(self.register_name)
-            
+            status_value = self._cached_read(self.register_name, client)
+
             if status_value is None:
                 return None
             
-            status_map = {
-                0: "空闲状态",
-                OPERATION_CODES['DOOR_OPEN']: "正在开门",
-                OPERATION_CODES['DOOR_CLOSE']: "正在关门",
-                OPERATION_CODES['DOOR_OPEN_COMPLETE']: "门已打开",
-                OPERATION_CODES['DOOR_CLOSE_COMPLETE']: "门已关闭"
-            }
+            return _STATUS_MAP.get(status_value, f"未知状态: {status_value}")
             
-            return status_map.get(status_value, f"未知状态: {status_value}")
-            
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"获取舱门状态异常: {e}")
             return None
     
@@ -155,14 +187,14 @@ class DoorController:
             bool: True表示门已打开，False表示门已关闭，None表示状态未知
         """
         try:
-            status_value = modbus_client.read_register_by_name(self.register_name)
-            
+            status_value = self._cached_read(self.register_name)
+
             if status_value is None:
                 return None
             
-            return status_value == OPERATION_CODES['DOOR_OPEN_COMPLETE']
+            return status_value == _DOOR_OPEN_COMPLETE
             
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"检查舱门状态异常: {e}")
             return None
     
@@ -173,14 +205,14 @@ class DoorController:
             bool: True表示门已关闭，False表示门已打开，None表示状态未知
         """
         try:
-            status_value = modbus_client.read_register_by_name(self.register_name)
-            
+            status_value = self._cached_read(self.register_name)
+
             if status_value is None:
                 return None
             
-            return status_value == OPERATION_CODES['DOOR_CLOSE_COMPLETE']
+            return status_value == _DOOR_CLOSE_COMPLETE
             
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"检查舱门状态异常: {e}")
             return None
     
@@ -191,8 +223,9 @@ class DoorController:
             bool: 操作是否成功
         """
         try:
-            return modbus_client.write_register_by_name(self.register_name, 0)
-        except Exception as e:
+            self._invalidate_cache()
+            return self._mc.write_register_by_name(self.register_name, 0)
+        except (ModbusException, OSError) as e:
             logger.error(f"重置舱门状态异常: {e}")
             return False
 
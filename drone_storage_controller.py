@@ -4,19 +4,63 @@
 实现无人机存件的完整流程控制
 """
 
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 from loguru import logger
 from base_controller import BaseController
 from door_controller import door_controller
-from config import OPERATION_CODES, POSITION_CODES
+from modbus_client import modbus_client
+from pymodbus.exceptions import ModbusException
+from config import OPERATION_CODES, POSITION_CODES, REGISTER_MAP
+
+# 操作码模块常量：加载时绑定一次，存件流程的各环节不再重复查表
+_STORAGE_FULL = OPERATION_CODES['STORAGE_FULL']
+_STORAGE_AVAILABLE = OPERATION_CODES['STORAGE_AVAILABLE']
+_DRONE_PRESENT = OPERATION_CODES['DRONE_PRESENT']
+_DRONE_PRESENT_CONFIRM = OPERATION_CODES['DRONE_PRESENT_CONFIRM']
+_DRONE_ABSENT = OPERATION_CODES['DRONE_ABSENT']
+_DRONE_ABSENT_CONFIRM = OPERATION_CODES['DRONE_ABSENT_CONFIRM']
+_STORE_PACKAGE = OPERATION_CODES['STORE_PACKAGE']
+_SERVO_CAN_OPEN = OPERATION_CODES['SERVO_CAN_OPEN']
+_SERVO_OPEN = OPERATION_CODES['SERVO_OPEN']
+_SERVO_OPEN_CONFIRM = OPERATION_CODES['SERVO_OPEN_CONFIRM']
+_SERVO_CAN_CLOSE = OPERATION_CODES['SERVO_CAN_CLOSE']
+_SERVO_CLOSE = OPERATION_CODES['SERVO_CLOSE']
+_SERVO_CLOSE_CONFIRM = OPERATION_CODES['SERVO_CLOSE_CONFIRM']
+_PICKUP_IN_PROGRESS = OPERATION_CODES['PICKUP_IN_PROGRESS']
+_PICKUP_COMPLETE = OPERATION_CODES['PICKUP_COMPLETE']
+_NO_PICKUP_COMPLETE = OPERATION_CODES['NO_PICKUP_COMPLETE']
+_FLOW_STORE_START = OPERATION_CODES['FLOW_STORE_START']
+_FLOW_STORE_COMPLETE = OPERATION_CODES['FLOW_STORE_COMPLETE']
+
+# 存储状态→(判定结果, 日志函数, 消息)表：容量检查热路径免分支链
+_CAP_TABLE = {
+    _STORAGE_FULL: (False, logger.warning, "机柜已存满，无法执行存件操作"),
+    _STORAGE_AVAILABLE: (True, logger.info, "机柜有空间，可以执行存件操作"),
+}
+
+# 位置码→位置编号映射（模块级构建一次）
+_POSITION_MAP = {
+    POSITION_CODES['POSITION_1']: 1,
+    POSITION_CODES['POSITION_2']: 2,
+    POSITION_CODES['POSITION_3']: 3,
+}
 
 
 class DroneStorageController(BaseController):
     """无人机存件控制器类"""
-    
-    def __init__(self):
+
+    # 固定属性集合，轮询循环里的属性读走C层偏移
+    __slots__ = ('landing_pad_register', 'package_op_register', 'servo_register',
+                 'storage_status_register', 'store_pos_register',
+                 'pickup_code_front_register', 'pickup_code_rear_register',
+                 'store_pos_addr', 'package_op_addr', '_mc')
+
+    def __init__(self, client=None):
         super().__init__()
+        # 绑定client引用：方法体内走LOAD_FAST+实例槽位而不是
+        # 模块全局查找，也便于测试时注入替身
+        self._mc = client if client is not None else modbus_client
         self.landing_pad_register = 'LANDING_PAD_STATUS'
         self.package_op_register = 'DRONE_PACKAGE_OP'
         self.servo_register = 'DRONE_SERVO'
@@ -24,6 +68,9 @@ class DroneStorageController(BaseController):
         self.store_pos_register = 'DRONE_STORE_POS'
         self.pickup_code_front_register = 'PICKUP_CODE_FRONT'
         self.pickup_code_rear_register = 'PICKUP_CODE_REAR'
+        # 热点寄存器地址初始化时解析一次，简单读写走整数地址路径
+        self.store_pos_addr = REGISTER_MAP[self.store_pos_register]
+        self.package_op_addr = REGISTER_MAP[self.package_op_register]
         
     def check_storage_capacity(self) -> Optional[bool]:
         """检查存储容量
@@ -33,21 +80,20 @@ class DroneStorageController(BaseController):
         """
         try:
             status = self.read_register_with_retry(self.storage_status_register)
-            
+
             if status is None:
                 return None
-            
-            if status == OPERATION_CODES['STORAGE_FULL']:
-                logger.warning("机柜已存满，无法执行存件操作")
-                return False
-            elif status == OPERATION_CODES['STORAGE_AVAILABLE']:
-                logger.info("机柜有空间，可以执行存件操作")
-                return True
-            else:
-                logger.warning(f"未知的存储状态: {status}")
-                return None
+
+            entry = _CAP_TABLE.get(status)
+            if entry is not None:
+                result, log_fn, message = entry
+                log_fn(message)
+                return result
+
+            logger.warning("未知的存储状态: {}", status)
+            return None
                 
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"检查存储容量异常: {e}")
             return None
     
@@ -63,27 +109,20 @@ class DroneStorageController(BaseController):
         logger.info("等待无人机降落...")
         
         try:
-            # 写入有飞机状态
-            if not modbus_client.write_register_by_name(
-                self.landing_pad_register,
-                OPERATION_CODES['DRONE_PRESENT']
-            ):
-                logger.error("写入无人机降落状态失败")
-                return False
-            
-            # 等待下位确认
-            if modbus_client.wait_for_register_value(
+            # 写入有飞机状态并立即轮询下位确认
+            if self._mc.write_then_wait(
                 self.landing_pad_register,
-                OPERATION_CODES['DRONE_PRESENT_CONFIRM'],
+                _DRONE_PRESENT,
+                _DRONE_PRESENT_CONFIRM,
                 timeout
             ):
                 logger.info("无人机降落确认完成")
                 return True
             else:
-                logger.error("无人机降落确认超时")
+                logger.error("无人机降落确认失败或超时")
                 return False
                 
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"确认无人机降落异常: {e}")
             return False
     
@@ -99,27 +138,20 @@ class DroneStorageController(BaseController):
         logger.info("确认无人机起飞...")
         
         try:
-            # 写入无飞机状态
-            if not modbus_client.write_register_by_name(
+            # 写入无飞机状态并立即轮询下位确认
+            if self._mc.write_then_wait(
                 self.landing_pad_register,
-                OPERATION_CODES['DRONE_ABSENT']
-            ):
-                logger.error("写入无人机起飞状态失败")
-                return False
-            
-            # 等待下位确认
-            if modbus_client.wait_for_register_value(
-                self.landing_pad_register,
-                OPERATION_CODES['DRONE_ABSENT_CONFIRM'],
+                _DRONE_ABSENT,
+                _DRONE_ABSENT_CONFIRM,
                 timeout
             ):
                 logger.info("无人机起飞确认完成")
                 return True
             else:
-                logger.error("无人机起飞确认超时")
+                logger.error("无人机起飞确认失败或超时")
                 return False
                 
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"确认无人机起飞异常: {e}")
             return False
     
@@ -132,34 +164,30 @@ class DroneStorageController(BaseController):
         Returns:
             bool: 操作是否成功
         """
-        if len(pickup_code) != 6 or not pickup_code.isdigit():
+        if len(pickup_code) != 6 or not pickup_code.isdigit() or not pickup_code.isascii():
             logger.error(f"取件码格式错误: {pickup_code}，应为6位数字")
             return False
         
         try:
-            front_three = int(pickup_code[:3])
-            rear_three = int(pickup_code[3:])
-            
-            # 写入前三位
-            if not modbus_client.write_register_by_name(
+            # 已通过isdigit校验的6位ASCII串，直接按字节算两个三位数，
+            # 省掉两次切片和两次通用int()解析
+            b = pickup_code.encode('ascii')
+            front_three = (b[0] - 48) * 100 + (b[1] - 48) * 10 + (b[2] - 48)
+            rear_three = (b[3] - 48) * 100 + (b[4] - 48) * 10 + (b[5] - 48)
+
+            # 前后三位寄存器地址相邻，合并为单次FC16事务写入，
+            # 省一次总线往返，也避免写到一半失败留下半个取件码
+            if not self._mc.write_registers_by_name(
                 self.pickup_code_front_register,
-                front_three
-            ):
-                logger.error("写入取件码前三位失败")
-                return False
-            
-            # 写入后三位
-            if not modbus_client.write_register_by_name(
-                self.pickup_code_rear_register,
-                rear_three
+                [front_three, rear_three]
             ):
-                logger.error("写入取件码后三位失败")
+                logger.error("写入取件码失败")
                 return False
-            
-            logger.info(f"取件码设置成功: {pickup_code}")
+
+            logger.info("取件码设置成功: {}", pickup_code)
             return True
             
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"设置取件码异常: {e}")
             return False
     
@@ -176,9 +204,9 @@ class DroneStorageController(BaseController):
         
         try:
             # 写入存包裹指令
-            if not modbus_client.write_register_by_name(
+            if not self._mc.write_register_by_name(
                 self.package_op_register,
-                OPERATION_CODES['STORE_PACKAGE']
+                _STORE_PACKAGE
             ):
                 logger.error("写入存包裹指令失败")
                 return False
@@ -186,7 +214,7 @@ class DroneStorageController(BaseController):
             logger.info("已发送存包裹指令")
             return True
             
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"开始存件操作异常: {e}")
             return False
     
@@ -208,66 +236,52 @@ class DroneStorageController(BaseController):
             if action == 'open':
                 # 等待可以开舵机的信号
                 logger.info("等待舵机开启信号...")
-                if not modbus_client.wait_for_register_value(
+                if not self._mc.wait_for_register_value(
                     self.servo_register,
-                    OPERATION_CODES['SERVO_CAN_OPEN'],
+                    _SERVO_CAN_OPEN,
                     timeout
                 ):
                     logger.error("等待舵机开启信号超时")
                     return False
                 
-                # 发送开舵机指令
-                if not modbus_client.write_register_by_name(
+                # 发送开舵机指令并立即轮询开舵机确认
+                if self._mc.write_then_wait(
                     self.servo_register,
-                    OPERATION_CODES['SERVO_OPEN']
-                ):
-                    logger.error("写入开舵机指令失败")
-                    return False
-                
-                # 等待开舵机确认
-                if modbus_client.wait_for_register_value(
-                    self.servo_register,
-                    OPERATION_CODES['SERVO_OPEN_CONFIRM'],
+                    _SERVO_OPEN,
+                    _SERVO_OPEN_CONFIRM,
                     timeout
                 ):
                     logger.info("舵机开启完成")
                     return True
                 else:
-                    logger.error("舵机开启确认超时")
+                    logger.error("舵机开启失败或确认超时")
                     return False
                     
             else:  # close
                 # 等待可以关舵机的信号
                 logger.info("等待舵机关闭信号...")
-                if not modbus_client.wait_for_register_value(
+                if not self._mc.wait_for_register_value(
                     self.servo_register,
-                    OPERATION_CODES['SERVO_CAN_CLOSE'],
+                    _SERVO_CAN_CLOSE,
                     timeout
                 ):
                     logger.error("等待舵机关闭信号超时")
                     return False
                 
-                # 发送关舵机指令
-                if not modbus_client.write_register_by_name(
-                    self.servo_register,
-                    OPERATION_CODES['SERVO_CLOSE']
-                ):
-                    logger.error("写入关舵机指令失败")
-                    return False
-                
-                # 等待关舵机确认
-                if modbus_client.wait_for_register_value(
+                # 发送关舵机指令并立即轮询关舵机确认
+                if self._mc.write_then_wait(
                     self.servo_register,
-                    OPERATION_CODES['SERVO_CLOSE_CONFIRM'],
+                    _SERVO_CLOSE,
+                    _SERVO_CLOSE_CONFIRM,
                     timeout
                 ):
                     logger.info("舵机关闭完成")
                     return True
                 else:
-                    logger.error("舵机关闭确认超时")
+                    logger.error("舵机关闭失败或确认超时")
                     return False
                     
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"控制舵机异常: {e}")
             return False
     
@@ -278,24 +292,94 @@ class DroneStorageController(BaseController):
             int: 存储位置编号，None表示获取失败
         """
         try:
-            position_code = modbus_client.read_register_by_name(self.store_pos_register)
+            position_code = self._mc.read_holding_register(self.store_pos_addr)
             
             if position_code is None:
                 return None
             
             # 将位置码转换为位置编号
-            position_map = {
-                POSITION_CODES['POSITION_1']: 1,
-                POSITION_CODES['POSITION_2']: 2,
-                POSITION_CODES['POSITION_3']: 3,
-            }
-            
-            return position_map.get(position_code)
+            return _POSITION_MAP.get(position_code)
             
-        except Exception as e:
+        except (ModbusException, OSError) as e:
             logger.error(f"获取存储位置异常: {e}")
             return None
     
+    def snapshot(self) -> Optional[dict]:
+        """一次Modbus事务读取存件相关寄存器快照
+
+        停机坪、包裹操作、舵机、存储状态和存包位置寄存器地址
+        彼此相邻，单次FC3读完整个区间，代替仪表盘逐项轮询的
+        4-5次独立往返。
+
+        Returns:
+            Optional[dict]: 各寄存器解码后的状态，失败返回None
+        """
+        values = self._mc.read_registers_by_names([
+            self.landing_pad_register,
+            self.package_op_register,
+            self.servo_register,
+            self.storage_status_register,
+            self.store_pos_register,
+        ])
+        if values is None:
+            return None
+
+        storage_status = values[self.storage_status_register]
+        return {
+            'landing_pad_status': values[self.landing_pad_register],
+            'package_op': values[self.package_op_register],
+            'servo_status': values[self.servo_register],
+            'storage_status': storage_status,
+            'has_capacity': (True if storage_status == _STORAGE_AVAILABLE
+                             else False if storage_status == _STORAGE_FULL else None),
+            'store_position': _POSITION_MAP.get(values[self.store_pos_register]),
+        }
+
+    def execute_storage_process_offloaded(self, pickup_code: str,
+                                          timeout: int = 120) -> Tuple[bool, Optional[int]]:
+        """执行存件流程（PLC脚本编排版）
+
+        下位机梯形图编排开门→降落→存包→舵机的完整握手序列，
+        上位机只写取件码和一次流程启动指令，再等待完成状态——
+        逐步握手的约8次Modbus往返收敛为2次。
+
+        仅在PLC已烧录STORAGE_FLOW流程脚本的机柜上启用；
+        未支持的机柜请继续使用execute_storage_process。
+
+        Args:
+            pickup_code: 6位取件码
+            timeout: 整个流程的超时时间（秒）
+
+        Returns:
+            Tuple[bool, Optional[int]]: (操作是否成功, 存储位置)
+        """
+        logger.info("开始执行无人机存件流程（PLC脚本编排），取件码: {}", pickup_code)
+
+        try:
+            if not self.check_storage_capacity():
+                return False, None
+
+            if not self.set_pickup_code(pickup_code):
+                return False, None
+
+            # 一次写入触发PLC侧完整流程，等待完成码
+            if not self._mc.write_then_wait(
+                'STORAGE_FLOW',
+                _FLOW_STORE_START,
+                _FLOW_STORE_COMPLETE,
+                timeout
+            ):
+                logger.error("PLC存件流程脚本执行失败或超时")
+                return False, None
+
+            storage_position = self.get_storage_position()
+            logger.info("无人机存件流程完成，存储位置: {}", storage_position)
+            return True, storage_position
+
+        except Exception as e:
+            logger.error(f"执行存件流程（PLC脚本编排）异常: {e}")
+            return False, None
+
     def execute_storage_process(self, pickup_code: str) -> Tuple[bool, Optional[int]]:
         """执行完整的存件流程
         
@@ -305,52 +389,62 @@ class DroneStorageController(BaseController):
         Returns:
             Tuple[bool, Optional[int]]: (操作是否成功, 存储位置)
         """
-        logger.info(f"开始执行无人机存件流程，取件码: {pickup_code}")
+        logger.info("开始执行无人机存件流程，取件码: {}", pickup_code)
         
         try:
             # 1. 检查存储容量
             if not self.check_storage_capacity():
                 return False, None
-            
-            # 2. 打开舱门
-            if not door_controller.open_door():
+
+            # 2. 打开舱门，同时设置取件码
+            # 两步没有数据依赖（取件码寄存器独立于舱门寄存器），
+            # 开门机械动作耗时数秒且等待期间总线空闲，取件码写入
+            # 放到这个窗口里，流程墙钟时间省一次写入往返
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                door_future = executor.submit(door_controller.open_door)
+                pickup_ok = self.set_pickup_code(pickup_code)
+                door_opened = door_future.result()
+
+            if not door_opened:
                 logger.error("打开舱门失败")
                 return False, None
-            
+
+            if not pickup_ok:
+                logger.error("设置取件码失败")
+                door_controller.close_door()
+                return False, None
+
             # 3. 等待无人机降落
             if not self.confirm_drone_landing():
                 logger.error("无人机降落确认失败")
                 door_controller.close_door()  # 关闭舱门
                 return False, None
-            
+
             # 4. 开始存件操作
             if not self.start_storage_operation():
                 logger.error("开始存件操作失败")
                 self.confirm_drone_takeoff()
                 door_controller.close_door()
                 return False, None
-            
-            # 5. 设置取件码
-            if not self.set_pickup_code(pickup_code):
-                logger.error("设置取件码失败")
-                self.confirm_drone_takeoff()
-                door_controller.close_door()
-                return False, None
-            
-            # 6. 控制舵机开启
+
+            # 5. 控制舵机开启（先记录开舵机前的包裹操作状态）
+            prior_package_status = self._mc.read_holding_register(self.package_op_addr)
             if not self.control_servo('open'):
                 logger.error("舵机开启失败")
                 self.confirm_drone_takeoff()
                 door_controller.close_door()
                 return False, None
-            
-            # 7. 检查无人机是否取空包裹
+
+            # 6. 检查无人机是否取空包裹
+            # 边沿检测代替固定睡眠：状态一更新立即继续，最长仍等2秒
             logger.info("检查无人机操作状态...")
-            time.sleep(2)  # 等待状态更新
-            
-            package_status = modbus_client.read_register_by_name(self.package_op_register)
+            package_status = self._mc.wait_for_register_change(
+                self.package_op_register,
+                prior_package_status,
+                timeout=2.0
+            )
             
-            if package_status == OPERATION_CODES['PICKUP_IN_PROGRESS']:
+            if package_status == _PICKUP_IN_PROGRESS:
                 logger.info("无人机正在取空包裹")
                 
                 # 等待取件完成信号，然后关闭舵机
@@ -359,15 +453,15 @@ class DroneStorageController(BaseController):
                     return False, None
                 
                 # 等待无人机可以起飞
-                if not modbus_client.wait_for_register_value(
+                if not self._mc.wait_for_register_value(
                     self.package_op_register,
-                    OPERATION_CODES['PICKUP_COMPLETE'],
+                    _PICKUP_COMPLETE,
                     60
                 ):
                     logger.error("等待无人机取件完成超时")
                     return False, None
                     
-            elif package_status == OPERATION_CODES['NO_PICKUP_COMPLETE']:
+            elif package_status == _NO_PICKUP_COMPLETE:
                 logger.info("无人机不取空包裹，直接起飞")
                 
                 # 关闭舵机
@@ -376,8 +470,19 @@ class DroneStorageController(BaseController):
                     return False, None
             
             else:
-                logger.warning(f"未知的包裹操作状态: {package_status}")
-            
+                logger.warning("未知的包裹操作状态: {}", package_status)
+
+            # 7. 顺带读取存储位置
+            # 舵机关闭后存件位置已由PLC锁存，与包裹操作状态地址相邻，
+            # 趁起飞确认前用一次FC3连读捎带取回，省掉流程末尾的单独读取
+            values = self._mc.read_registers_by_names(
+                [self.package_op_register, self.store_pos_register]
+            )
+            if values is not None:
+                storage_position = _POSITION_MAP.get(values[self.store_pos_register])
+            else:
+                storage_position = self.get_storage_position()
+
             # 8. 确认无人机起飞
             if not self.confirm_drone_takeoff():
                 logger.error("无人机起飞确认失败")
@@ -387,11 +492,8 @@ class DroneStorageController(BaseController):
             if not door_controller.close_door():
                 logger.error("关闭舱门失败")
                 return False, None
-            
-            # 10. 获取存储位置
-            storage_position = self.get_storage_position()
-            
-            logger.info(f"无人机存件流程完成，存储位置: {storage_position}")
+
+            logger.info("无人机存件流程完成，存储位置: {}", storage_position)
             return True, storage_position
             
         except Exception as e:
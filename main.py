@@ -4,23 +4,24 @@
 整合所有模块，提供统一的启动和管理接口
 """
 
+import os
 import sys
 import time
+import asyncio
+import queue
 import threading
 import signal
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Optional
 from loguru import logger
 from datetime import datetime
 
-# 导入所有控制器模块
+# 顶层只保留配置和Modbus客户端；控制器、监控和Web栈（FastAPI/
+# uvicorn）都在用到的分支里再导入，"info"等轻量命令不用付
+# 整个Web框架的冷启动导入开销
 from config import PLC_CONFIG, LOG_CONFIG, WEB_CONFIG
 from modbus_client import modbus_client
-from door_controller import door_controller
-from drone_storage_controller import drone_storage_controller
-from user_pickup_controller import user_pickup_controller
-from user_send_controller import user_send_controller
-from system_monitor import system_monitor
-from web_api import start_web_server
 
 
 class DroneLockerSystem:
@@ -28,6 +29,9 @@ class DroneLockerSystem:
     
     def __init__(self):
         self.running = False
+        # 停止事件：run_forever在它上面定时等待，shutdown置位后
+        # 立即唤醒退出，不用等满一个睡眠周期
+        self._stop_event = threading.Event()
         self.web_server_thread: Optional[threading.Thread] = None
         self.monitor_thread: Optional[threading.Thread] = None
         
@@ -52,19 +56,68 @@ class DroneLockerSystem:
             level=LOG_CONFIG['level']
         )
         
+        # 轮转后的压缩放到专门的后台线程：zip一个10MB文件要上百
+        # 毫秒，内联执行会卡住期间排队的所有日志写入，这里轮转时
+        # 只把文件路径入队，压缩由守护线程慢慢做
+        self._compress_queue = queue.Queue()
+        self._compressor_thread = threading.Thread(
+            target=self._compress_rotated_logs,
+            name='log-compressor',
+            daemon=True
+        )
+        self._compressor_thread.start()
+
         # 添加文件输出
+        # enqueue=True：写盘走后台线程队列，磁盘fsync不再卡住
+        # 控制流程和请求处理的热路径
+        # buffering=8192：小日志行在用户态攒成块再write，
+        # 减少每行一次的系统调用
+        # delay=True：首条日志时才打开文件，避免空文件占轮转序号
         logger.add(
             LOG_CONFIG['file'],
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             level=LOG_CONFIG['level'],
             rotation=LOG_CONFIG['rotation'],
             retention=LOG_CONFIG['retention'],
-            compression="zip",
-            encoding="utf-8"
+            compression=self._compress_queue.put,
+            encoding="utf-8",
+            enqueue=True,
+            buffering=8192,
+            delay=True,
+            colorize=False
         )
-        
+
         logger.info("日志系统配置完成")
+
+    def _compress_rotated_logs(self):
+        """后台压缩轮转出的日志文件"""
+        while True:
+            path = self._compress_queue.get()
+            try:
+                with zipfile.ZipFile(f"{path}.zip", 'w', zipfile.ZIP_DEFLATED) as zf:
+                    zf.write(path, os.path.basename(path))
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"压缩日志文件失败 {path}: {e}")
+            finally:
+                self._compress_queue.task_done()
     
+    def _with_deadline(self, fn, budget_s: float, description: str):
+        """带墙钟预算地执行一个初始化子检查
+
+        PLC迟缓时单个检查最多阻塞 timeout*retry_count 秒，串起来
+        会拖垮整个启动流程。超出预算就放弃该步继续往下走，检查
+        线程留在后台自行结束。
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            return executor.submit(fn).result(timeout=budget_s)
+        except FuturesTimeoutError:
+            logger.warning(f"{description}超过 {budget_s}s 预算，跳过")
+            return None
+        finally:
+            executor.shutdown(wait=False)
+
     def _signal_handler(self, signum, frame):
         """信号处理器"""
         logger.info(f"接收到信号 {signum}，开始关闭系统...")
@@ -81,6 +134,8 @@ class DroneLockerSystem:
             logger.info("正在初始化机器管理器...")
             from services.machine_manager import machine_manager
             from services.config_manager import config_manager
+            from system_monitor import system_monitor
+            from door_controller import door_controller
             
             # 获取所有机器配置
             all_configs = config_manager.get_all_configs()
@@ -97,18 +152,22 @@ class DroneLockerSystem:
             else:
                 logger.info(f"发现 {len(available_machines)} 台可用机器: {', '.join(available_machines)}")
                 
-                # 尝试连接所有机器
+                # 并发探测所有机器：每台机器各有独立连接，串行探测的
+                # 最坏耗时是 N×连接超时，并发后只取决于最慢的一台
                 connected_count = 0
-                for machine_name in available_machines:
-                    try:
-                        result = machine_manager.test_machine_connection(machine_name)
-                        if result['success']:
-                            logger.info(f"机器 {machine_name} 连接成功")
-                            connected_count += 1
-                        else:
-                            logger.warning(f"机器 {machine_name} 连接失败: {result.get('error', '未知错误')}")
-                    except Exception as e:
-                        logger.error(f"测试机器 {machine_name} 连接时发生异常: {e}")
+                try:
+                    health_results = asyncio.run(machine_manager.health_check_all())
+                except Exception as e:
+                    logger.error(f"并发测试机器连接异常: {e}")
+                    health_results = {}
+
+                for machine_name, result in health_results.items():
+                    if result.get('success'):
+                        logger.info(f"机器 {machine_name} 连接成功")
+                        connected_count += 1
+                    else:
+                        error_msg = result.get('error') or result.get('message', '未知错误')
+                        logger.warning(f"机器 {machine_name} 连接失败: {error_msg}")
                 
                 if connected_count == 0:
                     logger.error("所有机器连接失败，但系统将以离线模式启动")
@@ -119,7 +178,8 @@ class DroneLockerSystem:
             # 2. 检查系统状态（非阻塞）
             logger.info("正在检查系统状态...")
             try:
-                system_status = system_monitor.get_system_status()
+                system_status = self._with_deadline(
+                    system_monitor.get_system_status, 2.0, "系统状态检查")
                 if system_status:
                     logger.info(f"系统状态: {system_status['status_description']}")
                 else:
@@ -130,7 +190,8 @@ class DroneLockerSystem:
             # 3. 检查存储容量（非阻塞）
             logger.info("正在检查存储容量...")
             try:
-                storage_capacity = system_monitor.get_storage_capacity()
+                storage_capacity = self._with_deadline(
+                    system_monitor.get_storage_capacity, 2.0, "存储容量检查")
                 if storage_capacity:
                     logger.info("存储容量检查完成")
                 else:
@@ -141,7 +202,8 @@ class DroneLockerSystem:
             # 4. 检查气象条件（非阻塞）
             logger.info("正在检查气象条件...")
             try:
-                weather_check = system_monitor.check_weather_conditions()
+                weather_check = self._with_deadline(
+                    system_monitor.check_weather_conditions, 3.0, "气象条件检查")
                 if weather_check:
                     logger.info(f"气象条件: {weather_check['reason']}")
                 else:
@@ -152,12 +214,14 @@ class DroneLockerSystem:
             # 5. 初始化舱门状态（非阻塞）
             logger.info("正在初始化舱门状态...")
             try:
-                for position in range(1, 7):
-                    try:
-                        status = door_controller.get_door_status(position)
-                        logger.debug(f"舱门{position}状态: {status}")
-                    except Exception as e:
-                        logger.debug(f"获取舱门{position}状态失败: {e}")
+                # 本机型各舱门共用DOOR_CONTROL寄存器，逐门循环会对同一
+                # 地址连发6次读；一次读取即可覆盖全部舱门
+                status = self._with_deadline(
+                    door_controller.get_door_status, 1.0, "舱门状态检查")
+                if status is not None:
+                    logger.debug(f"舱门状态: {status}")
+                else:
+                    logger.debug("获取舱门状态失败")
             except Exception as e:
                 logger.warning(f"初始化舱门状态失败: {e}")
             
@@ -174,31 +238,74 @@ class DroneLockerSystem:
             return False
     
     def start_web_server(self):
-        """启动Web服务器"""
-        try:
-            logger.info(f"启动Web API服务器 - http://{WEB_CONFIG['host']}:{WEB_CONFIG['port']}")
-            
-            def run_server():
-                try:
-                    start_web_server()
-                except Exception as e:
-                    logger.error(f"Web服务器运行异常: {e}")
-            
-            self.web_server_thread = threading.Thread(target=run_server, daemon=True)
-            self.web_server_thread.start()
-            
-            # 等待服务器启动
-            time.sleep(2)
-            logger.info("Web API服务器启动完成")
-            
-        except Exception as e:
-            logger.error(f"启动Web服务器失败: {e}")
+        """前台启动Web服务器（阻塞）
+
+        多worker时uvicorn的多进程监管器要在自己的__init__里装
+        signal处理器，signal.signal只允许在主线程调用——放到
+        后台线程会直接ValueError、服务器根本起不来，所以这里
+        不再包线程，由run_forever在主线程上调用。
+        """
+        logger.info(f"启动Web API服务器 - http://{WEB_CONFIG['host']}:{WEB_CONFIG['port']}")
+
+        from web_api import start_web_server
+
+        start_web_server()
     
+    def _start_async_services(self):
+        """在同一个事件循环线程里承载Web服务与系统监控
+
+        Web线程和监控线程各自轮询会加倍GIL争抢；单worker部署时
+        两者作为任务共享一个循环、一个线程。server.started事件
+        替代原来固定的sleep(2)启动等待。
+        """
+        ready = threading.Event()
+
+        def run_loop():
+            async def serve():
+                import uvicorn
+                from web_api import app
+                from system_monitor import system_monitor
+
+                config = uvicorn.Config(
+                    app,
+                    host=WEB_CONFIG['host'],
+                    port=WEB_CONFIG['port'],
+                    log_level="info"
+                )
+                server = uvicorn.Server(config)
+                server_task = asyncio.ensure_future(server.serve())
+
+                while not server.started and not server_task.done():
+                    await asyncio.sleep(0.05)
+                ready.set()
+
+                monitor_task = asyncio.ensure_future(
+                    system_monitor.start_monitoring_async(interval=30))
+                await asyncio.gather(server_task, monitor_task,
+                                     return_exceptions=True)
+
+            try:
+                asyncio.run(serve())
+            except Exception as e:
+                logger.error(f"异步服务运行异常: {e}")
+            finally:
+                ready.set()
+
+        self.web_server_thread = threading.Thread(
+            target=run_loop, name='services', daemon=True)
+        self.web_server_thread.start()
+
+        ready.wait(timeout=15)
+        logger.info("Web API服务器启动完成")
+        logger.info("系统监控服务启动完成")
+
     def start_system_monitor(self):
         """启动系统监控"""
         try:
             logger.info("启动系统监控服务...")
-            
+
+            from system_monitor import system_monitor
+
             def run_monitor():
                 try:
                     system_monitor.start_monitoring(interval=30)
@@ -226,12 +333,15 @@ class DroneLockerSystem:
                 logger.error("系统初始化失败，无法启动")
                 return False
             
-            # 2. 启动Web服务器
-            self.start_web_server()
-            
-            # 3. 启动系统监控
-            self.start_system_monitor()
-            
+            # 2/3. 启动Web服务器与系统监控
+            # 单worker时合并到一个事件循环线程；多worker时Web服务器
+            # 必须占用主线程（见start_web_server），这里只起监控，
+            # 服务器由run_forever在前台拉起
+            if WEB_CONFIG.get('workers', 1) > 1:
+                self.start_system_monitor()
+            else:
+                self._start_async_services()
+
             # 4. 标记系统运行状态
             self.running = True
             
@@ -253,12 +363,18 @@ class DroneLockerSystem:
         logger.info("开始关闭无人机快递柜系统...")
         
         try:
-            # 1. 标记系统停止
+            # 1. 标记系统停止并唤醒run_forever
             self.running = False
+            self._stop_event.set()
             
             # 2. 断开PLC连接
             logger.info("断开PLC连接...")
             modbus_client.disconnect()
+
+            # 断开机器连接池（只在已加载时清理，避免关停路径引入导入）
+            machine_manager_module = sys.modules.get('services.machine_manager')
+            if machine_manager_module is not None:
+                machine_manager_module.machine_manager.disconnect_all()
             
             # 3. 等待线程结束
             if self.web_server_thread and self.web_server_thread.is_alive():
@@ -280,69 +396,79 @@ class DroneLockerSystem:
         if not self.start():
             logger.error("系统启动失败")
             return
-        
+
         try:
             logger.info("系统正在运行，按 Ctrl+C 停止...")
-            
-            # 连接检查间隔（秒）
-            connection_check_interval = 30
-            last_check_time = 0
-            
-            while self.running:
-                time.sleep(1)
-                current_time = time.time()
-                
-                # 定期检查连接状态（避免频繁检查）
-                if current_time - last_check_time >= connection_check_interval:
-                    last_check_time = current_time
-                    
-                    try:
-                        # 导入机器管理器
-                        from services.machine_manager import machine_manager
-                        from services.config_manager import config_manager
-                        
-                        # 获取所有机器状态
-                        all_status = machine_manager.get_all_machine_status()
-                        
-                        if all_status:
-                            # 统计连接状态
-                            total_machines = len(all_status)
-                            connected_machines = sum(1 for status in all_status.values() 
-                                                   if status.get('connected', False))
-                            
-                            if connected_machines == 0:
-                                logger.warning(f"所有机器({total_machines}台)均已断开连接")
-                                # 尝试重连一台机器作为测试
-                                for machine_name in list(all_status.keys())[:1]:  # 只测试第一台
-                                    try:
-                                        result = machine_manager.test_machine_connection(machine_name)
-                                        if result['success']:
-                                            logger.info(f"机器 {machine_name} 重连成功")
-                                            break
-                                    except Exception as e:
-                                        logger.debug(f"测试机器 {machine_name} 连接失败: {e}")
-                            elif connected_machines < total_machines:
-                                logger.info(f"部分机器在线: {connected_machines}/{total_machines}")
-                            else:
-                                logger.debug(f"所有机器({total_machines}台)连接正常")
-                        else:
-                            # 没有配置多机器，检查默认PLC连接
-                            if not modbus_client.is_connected:
-                                logger.warning("默认PLC连接断开，尝试重新连接...")
-                                if modbus_client.reconnect():
-                                    logger.info("默认PLC重新连接成功")
-                                else:
-                                    logger.debug("默认PLC重新连接失败")
-                    
-                    except Exception as e:
-                        logger.debug(f"连接状态检查异常: {e}")
-                
+
+            if WEB_CONFIG.get('workers', 1) > 1:
+                # 多worker：连接巡检让位到后台线程，主线程交给
+                # uvicorn多进程监管器（信号处理器只能装在主线程）
+                watchdog = threading.Thread(
+                    target=self._connection_watchdog,
+                    name='connection-watchdog', daemon=True
+                )
+                watchdog.start()
+                self.start_web_server()
+            else:
+                self._connection_watchdog()
+
         except KeyboardInterrupt:
             logger.info("接收到中断信号")
         except Exception as e:
             logger.error(f"系统运行异常: {e}")
         finally:
             self.shutdown()
+
+    def _connection_watchdog(self):
+        """周期巡检各机器连接并在全断时尝试重连"""
+        # 连接检查间隔（秒）
+        connection_check_interval = 30
+
+        # 管理器引用提到循环外，每个周期不再重复走导入机制
+        from services.machine_manager import machine_manager
+
+        # 在停止事件上定时等待：每个检查周期只唤醒一次，
+        # shutdown置位事件后立即退出，不再每秒空转
+        while not self._stop_event.wait(timeout=connection_check_interval):
+            try:
+                # 并发获取所有机器状态
+                all_status = asyncio.run(machine_manager.get_all_status())
+
+                if all_status:
+                    # 单趟统计连接状态
+                    total_machines = len(all_status)
+                    connected_machines = 0
+                    for status in all_status.values():
+                        if status.get('connected', False):
+                            connected_machines += 1
+
+                    if connected_machines == 0:
+                        logger.warning(f"所有机器({total_machines}台)均已断开连接")
+                        # 尝试重连第一台机器作为测试（不为取首个键建列表）
+                        machine_name = next(iter(all_status), None)
+                        if machine_name is not None:
+                            try:
+                                result = machine_manager.test_machine_connection(machine_name)
+                                if result['success']:
+                                    logger.info(f"机器 {machine_name} 重连成功")
+                            except Exception as e:
+                                logger.debug(f"测试机器 {machine_name} 连接失败: {e}")
+                    elif connected_machines < total_machines:
+                        logger.info(f"部分机器在线: {connected_machines}/{total_machines}")
+                    else:
+                        logger.debug(f"所有机器({total_machines}台)连接正常")
+                else:
+                    # 没有配置多机器，检查默认PLC连接
+                    if not modbus_client.is_connected:
+                        logger.warning("默认PLC连接断开，尝试重新连接...")
+                        if modbus_client.reconnect():
+                            logger.info("默认PLC重新连接成功")
+                        else:
+                            logger.debug("默认PLC重新连接失败")
+
+            except Exception as e:
+                logger.debug(f"连接状态检查异常: {e}")
+
     
     def get_system_info(self) -> dict:
         """获取系统信息"""
@@ -351,6 +477,7 @@ class DroneLockerSystem:
             "version": "1.0.0",
             "running": self.running,
             "plc_connected": modbus_client.is_connected,
+            "plc_breaker_state": modbus_client.breaker_state,
             "web_server_running": self.web_server_thread and self.web_server_thread.is_alive(),
             "monitor_running": self.monitor_thread and self.monitor_thread.is_alive(),
             "startup_time": datetime.now().isoformat()
@@ -372,6 +499,8 @@ def main():
         elif command == "test":
             # 测试模式
             logger.info("测试模式启动")
+            from door_controller import door_controller
+            from system_monitor import system_monitor
             if system.initialize_system():
                 logger.info("系统测试通过")
                 
@@ -4,6 +4,10 @@ Modbus通信客户端模块
 用于与PLC设备进行通信
 """
 
+import asyncio
+import random
+import socket
+import threading
 import time
 from typing import Optional, Union
 from pymodbus.client import ModbusTcpClient
@@ -11,18 +15,80 @@ from pymodbus.exceptions import ModbusException
 from loguru import logger
 from config import PLC_CONFIG, REGISTER_MAP, OPERATION_CODES
 
+# 名称→地址表在导入时物化为普通dict，按名访问就是一次dict命中；
+# 需要彻底绕开名称解析的热点可在初始化时解析一次地址，
+# 直接走read/write_holding_register(s)的整数地址路径
+_ADDR = dict(REGISTER_MAP)
+_register_address = _ADDR.get
+
 
 class ModbusClient:
     """Modbus TCP客户端类"""
-    
+
+    # 熔断阈值：连续失败这么多次后短路后续请求
+    _BREAKER_FAIL_THRESHOLD = 5
+    # 熔断冷却时间（秒）：冷却期满放行一个探测请求
+    _BREAKER_COOLDOWN = 10.0
+    # 在线判定TTL（秒）：真实流量这么久内成功过就免探测
+    _LIVENESS_TTL = 5.0
+    # 寄存器读缓存TTL（秒）：寄存器变化以秒计，200ms内的重复读
+    # 直接回缓存值；写入会使对应地址失效，等待类轮询强制穿透
+    _CACHE_TTL = 0.2
+    # 隔板限流：同时进行（含排队）的总线操作上限，PLC卡死时
+    # 不会有几十个线程都堵在锁上
+    _BULKHEAD_LIMIT = 4
+
     def __init__(self, host=None, port=None, timeout=None, retry_count=None, unit_id=None):
         self.client = None
         self.is_connected = False
+        # 总线锁：PLC在单连接上串行处理请求，多线程并发访问共享
+        # client时在客户端侧排队，避免事务交错
+        self._io_lock = threading.RLock()
+        # 熔断器：PLC失联时每次调用都要陪满retry_count×timeout，
+        # 连续失败达到阈值后直接短路，冷却期内立即返回失败
+        self._fail_count = 0
+        self._breaker_open_until = 0.0
+        # 最近一次成功收发的时刻，供check_connection免探测判活
+        self._last_ok_ts = 0.0
+        # 寄存器读缓存：{地址: (过期时刻, 值)}
+        self._cache = {}
+        # 并发槽位：超出上限的调用快速失败而不是排队堆线程
+        self._bulkhead = threading.BoundedSemaphore(self._BULKHEAD_LIMIT)
         self.host = host or PLC_CONFIG['host']
         self.port = port or PLC_CONFIG['port']
         self.timeout = timeout or PLC_CONFIG['timeout']
         self.retry_count = retry_count or PLC_CONFIG['retry_count']
         self.unit_id = unit_id or PLC_CONFIG['unit_id']
+
+    @property
+    def breaker_state(self) -> str:
+        """熔断器状态：closed/open/half_open"""
+        if self._fail_count < self._BREAKER_FAIL_THRESHOLD:
+            return 'closed'
+        return 'half_open' if time.time() >= self._breaker_open_until else 'open'
+
+    def _breaker_allows(self) -> bool:
+        """熔断器放行检查
+
+        CLOSED时全部放行；OPEN且未到冷却时间直接拒绝；冷却期满
+        进入HALF_OPEN，放行探测请求，成功则闭合、失败则重新计时。
+        """
+        if self._fail_count < self._BREAKER_FAIL_THRESHOLD:
+            return True
+        return time.time() >= self._breaker_open_until
+
+    def _breaker_record(self, success: bool):
+        """记录一次请求结果，驱动熔断器状态迁移"""
+        if success:
+            if self._fail_count >= self._BREAKER_FAIL_THRESHOLD:
+                logger.info("PLC通信恢复，熔断器闭合")
+            self._fail_count = 0
+            self._last_ok_ts = time.time()
+        else:
+            self._fail_count += 1
+            if self._fail_count >= self._BREAKER_FAIL_THRESHOLD:
+                self._breaker_open_until = time.time() + self._BREAKER_COOLDOWN
+                logger.warning("PLC连续失败 {} 次，熔断 {}s", self._fail_count, self._BREAKER_COOLDOWN)
         
     def connect(self) -> bool:
         """连接到PLC设备"""
@@ -32,18 +98,41 @@ class ModbusClient:
                 port=self.port,
                 timeout=self.timeout
             )
-            
+
             if self.client.connect():
                 self.is_connected = True
+                self._tune_socket()
                 logger.info(f"成功连接到PLC设备 {self.host}:{self.port}")
                 return True
             else:
                 logger.error(f"无法连接到PLC设备 {self.host}:{self.port}")
                 return False
-                
+
         except Exception as e:
             logger.error(f"连接PLC设备时发生异常: {e}")
             return False
+
+    def _tune_socket(self):
+        """调优底层TCP socket
+
+        - TCP_NODELAY：Modbus请求只有十几个字节且对延迟敏感，
+          禁用Nagle合并，避免内核攒包带来的几十毫秒延迟
+        - keepalive：死链探测交给内核（5秒空闲后每2秒探测，
+          3次失败判死），业务操作前就不再需要额外的探测往返
+        """
+        sock = getattr(self.client, 'socket', None)
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # 以下选项仅Linux可用
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 5)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 2)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        except OSError as e:
+            logger.debug("调优PLC socket失败: {}", e)
     
     def disconnect(self):
         """断开PLC连接"""
@@ -52,34 +141,58 @@ class ModbusClient:
             self.is_connected = False
             logger.info("已断开PLC连接")
     
-    def read_holding_register(self, address: int) -> Optional[int]:
-        """读取保持寄存器"""
+    def read_holding_register(self, address: int, read_nocache: bool = False) -> Optional[int]:
+        """读取保持寄存器
+
+        Args:
+            address: 寄存器地址
+            read_nocache: True时跳过读缓存，强制走总线
+        """
         if not self.is_connected:
             logger.error("PLC未连接")
             return None
-            
-        for attempt in range(self.retry_count):
-            try:
-                result = self.client.read_holding_registers(
-                    address=address,
-                    count=1,
-                    device_id=self.unit_id
-                )
+
+        if not read_nocache:
+            cached = self._cache.get(address)
+            if cached is not None and time.monotonic() < cached[0]:
+                return cached[1]
+
+        if not self._breaker_allows():
+            logger.debug("熔断器打开，跳过读取寄存器 0x{:04X}", address)
+            return None
+
+        if not self._bulkhead.acquire(timeout=self.timeout):
+            logger.warning("Modbus并发槽位已满，放弃本次操作 (0x{:04X})", address)
+            return None
+        try:
+            for attempt in range(self.retry_count):
+                try:
+                    with self._io_lock:
+                        result = self.client.read_holding_registers(
+                            address=address,
+                            count=1,
+                            device_id=self.unit_id
+                        )
                 
-                if not result.isError():
-                    value = result.registers[0]
-                    logger.debug(f"读取寄存器 0x{address:04X}: {value}")
-                    return value
-                else:
-                    logger.warning(f"读取寄存器 0x{address:04X} 失败: {result}")
+                    if not result.isError():
+                        self._breaker_record(True)
+                        value = result.registers[0]
+                        self._cache[address] = (time.monotonic() + self._CACHE_TTL, value)
+                        logger.debug("读取寄存器 0x{:04X}: {}", address, value)
+                        return value
+                    else:
+                        logger.warning("读取寄存器 0x{:04X} 失败: {}", address, result)
                     
-            except ModbusException as e:
-                logger.warning(f"读取寄存器 0x{address:04X} 异常 (尝试 {attempt + 1}/{self.retry_count}): {e}")
-                if attempt < self.retry_count - 1:
-                    time.sleep(0.1)
+                except ModbusException as e:
+                    logger.warning("读取寄存器 0x{:04X} 异常 (尝试 {}/{}): {}", address, attempt + 1, self.retry_count, e)
+                    if attempt < self.retry_count - 1:
+                        self.reconnect()
                     
-        logger.error(f"读取寄存器 0x{address:04X} 失败，已重试 {self.retry_count} 次")
-        return None
+            self._breaker_record(False)
+            logger.error("读取寄存器 0x{:04X} 失败，已重试 {} 次", address, self.retry_count)
+            return None
+        finally:
+            self._bulkhead.release()
     
     def read_holding_registers(self, address: int, count: int = 1, **kwargs) -> Optional[list]:
         """读取多个保持寄存器
@@ -95,112 +208,403 @@ class ModbusClient:
             
         # 忽略unit, slave等参数，使用实例的unit_id
         if 'unit' in kwargs or 'slave' in kwargs:
-            logger.debug(f"忽略传入的unit/slave参数，使用配置的unit_id: {self.unit_id}")
-            
-        for attempt in range(self.retry_count):
-            try:
-                result = self.client.read_holding_registers(
-                    address=address,
-                    count=count,
-                    device_id=self.unit_id
-                )
+            logger.debug("忽略传入的unit/slave参数，使用配置的unit_id: {}", self.unit_id)
+
+        if not self._breaker_allows():
+            logger.debug("熔断器打开，跳过读取寄存器 0x{:04X}-0x{:04X}", address, address + count - 1)
+            return None
+
+        if not self._bulkhead.acquire(timeout=self.timeout):
+            logger.warning("Modbus并发槽位已满，放弃本次操作 (0x{:04X})", address)
+            return None
+        try:
+            for attempt in range(self.retry_count):
+                try:
+                    with self._io_lock:
+                        result = self.client.read_holding_registers(
+                            address=address,
+                            count=count,
+                            device_id=self.unit_id
+                        )
                 
-                if not result.isError():
-                    values = result.registers
-                    logger.debug(f"读取寄存器 0x{address:04X}-0x{address+count-1:04X}: {values}")
-                    return values
-                else:
-                    logger.warning(f"读取寄存器 0x{address:04X}-0x{address+count-1:04X} 失败: {result}")
+                    if not result.isError():
+                        self._breaker_record(True)
+                        values = result.registers
+                        logger.debug("读取寄存器 0x{:04X}-0x{:04X}: {}", address, address + count - 1, values)
+                        return values
+                    else:
+                        logger.warning("读取寄存器 0x{:04X}-0x{:04X} 失败: {}", address, address + count - 1, result)
                     
-            except ModbusException as e:
-                logger.warning(f"读取寄存器 0x{address:04X}-0x{address+count-1:04X} 异常 (尝试 {attempt + 1}/{self.retry_count}): {e}")
-                if attempt < self.retry_count - 1:
-                    time.sleep(0.1)
+                except ModbusException as e:
+                    logger.warning("读取寄存器 0x{:04X}-0x{:04X} 异常 (尝试 {}/{}): {}", address, address + count - 1, attempt + 1, self.retry_count, e)
+                    if attempt < self.retry_count - 1:
+                        self.reconnect()
                     
-        logger.error(f"读取寄存器 0x{address:04X}-0x{address+count-1:04X} 失败，已重试 {self.retry_count} 次")
-        return None
+            self._breaker_record(False)
+            logger.error("读取寄存器 0x{:04X}-0x{:04X} 失败，已重试 {} 次", address, address + count - 1, self.retry_count)
+            return None
+        finally:
+            self._bulkhead.release()
     
     def write_holding_register(self, address: int, value: int) -> bool:
         """写入保持寄存器"""
         if not self.is_connected:
             logger.error("PLC未连接")
             return False
-            
-        for attempt in range(self.retry_count):
-            try:
-                result = self.client.write_register(
-                    address=address,
-                    value=value,
-                    device_id=self.unit_id
-                )
+
+        # 写前使读缓存失效，后续读取看到的一定是写入后的状态
+        self._cache.pop(address, None)
+
+        if not self._breaker_allows():
+            logger.debug("熔断器打开，跳过写入寄存器 0x{:04X}", address)
+            return False
+
+        if not self._bulkhead.acquire(timeout=self.timeout):
+            logger.warning("Modbus并发槽位已满，放弃本次操作 (0x{:04X})", address)
+            return False
+        try:
+            for attempt in range(self.retry_count):
+                try:
+                    with self._io_lock:
+                        result = self.client.write_register(
+                            address=address,
+                            value=value,
+                            device_id=self.unit_id
+                        )
                 
-                if not result.isError():
-                    logger.debug(f"写入寄存器 0x{address:04X}: {value}")
-                    return True
-                else:
-                    logger.warning(f"写入寄存器 0x{address:04X} 失败: {result}")
+                    if not result.isError():
+                        self._breaker_record(True)
+                        logger.debug("写入寄存器 0x{:04X}: {}", address, value)
+                        return True
+                    else:
+                        logger.warning("写入寄存器 0x{:04X} 失败: {}", address, result)
                     
-            except ModbusException as e:
-                logger.warning(f"写入寄存器 0x{address:04X} 异常 (尝试 {attempt + 1}/{self.retry_count}): {e}")
-                if attempt < self.retry_count - 1:
-                    time.sleep(0.1)
+                except ModbusException as e:
+                    logger.warning("写入寄存器 0x{:04X} 异常 (尝试 {}/{}): {}", address, attempt + 1, self.retry_count, e)
+                    if attempt < self.retry_count - 1:
+                        self.reconnect()
                     
-        logger.error(f"写入寄存器 0x{address:04X} 失败，已重试 {self.retry_count} 次")
-        return False
+            self._breaker_record(False)
+            logger.error("写入寄存器 0x{:04X} 失败，已重试 {} 次", address, self.retry_count)
+            return False
+        finally:
+            self._bulkhead.release()
     
+    def write_holding_registers(self, address: int, values: list) -> bool:
+        """写入多个连续保持寄存器（单次FC16事务）"""
+        if not self.is_connected:
+            logger.error("PLC未连接")
+            return False
+
+        # 写前使覆盖区间的读缓存失效
+        for cached_addr in range(address, address + len(values)):
+            self._cache.pop(cached_addr, None)
+
+        if not self._breaker_allows():
+            logger.debug("熔断器打开，跳过写入寄存器 0x{:04X}-0x{:04X}", address, address + len(values) - 1)
+            return False
+
+        if not self._bulkhead.acquire(timeout=self.timeout):
+            logger.warning("Modbus并发槽位已满，放弃本次操作 (0x{:04X})", address)
+            return False
+        try:
+            for attempt in range(self.retry_count):
+                try:
+                    with self._io_lock:
+                        result = self.client.write_registers(
+                            address=address,
+                            values=values,
+                            device_id=self.unit_id
+                        )
+
+                    if not result.isError():
+                        self._breaker_record(True)
+                        logger.debug("写入寄存器 0x{:04X}-0x{:04X}: {}", address, address + len(values) - 1, values)
+                        return True
+                    else:
+                        logger.warning("写入寄存器 0x{:04X}-0x{:04X} 失败: {}", address, address + len(values) - 1, result)
+
+                except ModbusException as e:
+                    logger.warning("写入寄存器 0x{:04X}-0x{:04X} 异常 (尝试 {}/{}): {}", address, address + len(values) - 1, attempt + 1, self.retry_count, e)
+                    if attempt < self.retry_count - 1:
+                        self.reconnect()
+
+            self._breaker_record(False)
+            logger.error("写入寄存器 0x{:04X}-0x{:04X} 失败，已重试 {} 次", address, address + len(values) - 1, self.retry_count)
+            return False
+        finally:
+            self._bulkhead.release()
+
+    def write_registers_by_name(self, start_register_name: str, values: list) -> bool:
+        """从指定名称的寄存器起连续写入多个值（单次Modbus事务）
+
+        Args:
+            start_register_name: 起始寄存器名称
+            values: 依地址顺序写入的值列表
+        """
+        address = _register_address(start_register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", start_register_name)
+            return False
+
+        return self.write_holding_registers(address, values)
+
     def read_register_by_name(self, register_name: str) -> Optional[int]:
         """通过寄存器名称读取数据"""
-        if register_name not in REGISTER_MAP:
-            logger.error(f"未知的寄存器名称: {register_name}")
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
             return None
-            
-        address = REGISTER_MAP[register_name]
+
         return self.read_holding_register(address)
-    
+
+    def read_registers_by_names(self, register_names: list) -> Optional[dict]:
+        """按名称批量读取一组寄存器（单次Modbus事务）
+
+        将各寄存器地址的最小-最大区间合并为一次read_holding_registers
+        调用，再按名称切片，N个寄存器只付一次往返开销。要求各地址
+        彼此邻近（区间不超过Modbus单次读取上限125个寄存器）。
+
+        Args:
+            register_names: 寄存器名称列表
+
+        Returns:
+            Optional[dict]: {寄存器名称: 值}，失败返回None
+        """
+        addresses = {}
+        for name in register_names:
+            address = _register_address(name)
+            if address is None:
+                logger.error(f"未知的寄存器名称: {name}")
+                return None
+            addresses[name] = address
+
+        if not addresses:
+            return {}
+
+        min_addr = min(addresses.values())
+        max_addr = max(addresses.values())
+        count = max_addr - min_addr + 1
+        if count > 125:
+            logger.error("批量读取区间过大: 0x{:04X}-0x{:04X} ({}个寄存器)", min_addr, max_addr, count)
+            return None
+
+        values = self.read_holding_registers(min_addr, count)
+        if values is None:
+            return None
+
+        return {name: values[addr - min_addr] for name, addr in addresses.items()}
+
+    def read_many(self, addresses: list) -> Optional[dict]:
+        """批量读取一组（可能不连续的）寄存器地址
+
+        同步客户端在单连接上没有真正的请求流水线，这里用分组连读
+        达到同样的省往返效果：地址排序后切成连续段，每段发一次FC3
+        事务，段内各地址从返回列表切片。N个散落地址的开销从N次
+        往返降到连续段数次。
+
+        Args:
+            addresses: 寄存器地址列表
+
+        Returns:
+            Optional[dict]: {地址: 值}，任一段读取失败返回None
+        """
+        if not addresses:
+            return {}
+
+        sorted_addrs = sorted(set(addresses))
+        runs = []
+        run_start = prev = sorted_addrs[0]
+        for addr in sorted_addrs[1:]:
+            if addr == prev + 1:
+                prev = addr
+                continue
+            runs.append((run_start, prev))
+            run_start = prev = addr
+        runs.append((run_start, prev))
+
+        result = {}
+        for start, end in runs:
+            values = self.read_holding_registers(start, end - start + 1)
+            if values is None:
+                return None
+            for offset, value in enumerate(values):
+                result[start + offset] = value
+        return result
+
     def write_register_by_name(self, register_name: str, value: int) -> bool:
         """通过寄存器名称写入数据"""
-        if register_name not in REGISTER_MAP:
-            logger.error(f"未知的寄存器名称: {register_name}")
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
             return False
-            
-        address = REGISTER_MAP[register_name]
+
         return self.write_holding_register(address, value)
     
     def wait_for_register_value(self, register_name: str, expected_value: int, timeout: int = 30) -> bool:
-        """等待寄存器达到指定值"""
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            current_value = self.read_register_by_name(register_name)
+        """等待寄存器达到指定值
+
+        自适应轮询：间隔从20ms起逐次翻倍，上限500ms，并带±20%
+        抖动防止多个等待方的轮询节拍同步。快速完成的握手几十毫秒
+        内返回，慢操作则退避到原来的轮询频率，不会一直以高频打PLC。
+        """
+        # 地址只解析一次，轮询循环内走整数地址路径
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
+            return False
+
+        deadline = time.perf_counter() + timeout
+        interval = 0.02
+
+        while time.perf_counter() < deadline:
+            current_value = self.read_holding_register(address, read_nocache=True)
             if current_value == expected_value:
-                logger.info(f"寄存器 {register_name} 已达到期望值: {expected_value}")
+                logger.info("寄存器 {} 已达到期望值: {}", register_name, expected_value)
                 return True
-            time.sleep(0.5)
-            
-        logger.error(f"等待寄存器 {register_name} 达到值 {expected_value} 超时")
+            delay = interval * (0.8 + 0.4 * random.random())
+            time.sleep(min(delay, max(0.0, deadline - time.perf_counter())))
+            interval = min(interval * 2, 0.5)
+
+        logger.error("等待寄存器 {} 达到值 {} 超时", register_name, expected_value)
+        return False
+
+    async def await_register_value(self, register_name: str, expected_value: int, timeout: int = 30) -> bool:
+        """wait_for_register_value的异步版本
+
+        轮询节奏与同步版一致，但间隔用asyncio.sleep让出事件循环，
+        供Web API的异步接口等待握手时不占住线程。
+        """
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
+            return False
+
+        deadline = time.perf_counter() + timeout
+        interval = 0.02
+
+        while time.perf_counter() < deadline:
+            current_value = await asyncio.to_thread(self.read_holding_register, address, True)
+            if current_value == expected_value:
+                logger.info("寄存器 {} 已达到期望值: {}", register_name, expected_value)
+                return True
+            delay = interval * (0.8 + 0.4 * random.random())
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.perf_counter())))
+            interval = min(interval * 2, 0.5)
+
+        logger.error("等待寄存器 {} 达到值 {} 超时", register_name, expected_value)
         return False
     
+    def wait_for_register_change(self, register_name: str, prior_value: Optional[int],
+                                 timeout: float = 2.0) -> Optional[int]:
+        """等待寄存器离开给定值（边沿检测）
+
+        代替固定睡眠的状态等待：从短间隔开始轮询并指数加长，
+        寄存器一变化立即返回新值；下位机几十毫秒内更新时不用
+        白等整个固定周期。
+
+        Args:
+            register_name: 寄存器名称
+            prior_value: 变化前的值
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            Optional[int]: 变化后的新值；超时返回最后一次读到的值
+        """
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
+            return prior_value
+
+        deadline = time.perf_counter() + timeout
+        interval = 0.02
+        current_value = prior_value
+
+        while time.perf_counter() < deadline:
+            current_value = self.read_holding_register(address, read_nocache=True)
+            if current_value is not None and current_value != prior_value:
+                return current_value
+            delay = interval * (0.8 + 0.4 * random.random())
+            time.sleep(min(delay, max(0.0, deadline - time.perf_counter())))
+            interval = min(interval * 2, 0.5)
+
+        logger.debug("寄存器 {} 在 {}s 内未离开值 {}", register_name, timeout, prior_value)
+        return current_value
+
+    def write_then_wait(self, register_name: str, write_value: int,
+                        expected_value: int, timeout: int = 30,
+                        check_interval: float = 0.5) -> bool:
+        """写入后在同一连接上立即轮询等待期望值（写-等融合）
+
+        写ACK返回后马上发起第一次读，不先进入固定睡眠；下位机
+        响应快时握手在一次往返内完成，而不是至少等一个轮询周期。
+
+        Args:
+            register_name: 寄存器名称
+            write_value: 要写入的值
+            expected_value: 等待出现的期望值
+            timeout: 超时时间（秒）
+            check_interval: 后续轮询间隔（秒）
+
+        Returns:
+            bool: 期望值出现返回True，写失败或超时返回False
+        """
+        address = _register_address(register_name)
+        if address is None:
+            logger.error("未知的寄存器名称: {}", register_name)
+            return False
+
+        if not self.write_holding_register(address, write_value):
+            return False
+
+        start_time = time.time()
+        while True:
+            current_value = self.read_holding_register(address, read_nocache=True)
+            if current_value == expected_value:
+                logger.info("寄存器 {} 已达到期望值: {}", register_name, expected_value)
+                return True
+            if time.time() - start_time >= timeout:
+                break
+            time.sleep(check_interval)
+
+        logger.error("等待寄存器 {} 达到值 {} 超时", register_name, expected_value)
+        return False
+
     def check_connection(self) -> bool:
-        """检查连接状态"""
+        """检查连接状态
+
+        真实流量刚成功过（TTL内）就直接判定在线，不再发探测读；
+        只有链路空闲超过TTL时才退回到读SYSTEM_STATUS实测。
+        """
         if not self.is_connected:
             return False
-            
+
+        if time.time() - self._last_ok_ts < self._LIVENESS_TTL:
+            return True
+
         try:
             # 尝试读取一个寄存器来测试连接
-            result = self.client.read_holding_registers(
-                address=REGISTER_MAP['SYSTEM_STATUS'],
-                count=1,
-                device_id=self.unit_id
-            )
-            return not result.isError()
+            with self._io_lock:
+                result = self.client.read_holding_registers(
+                    address=REGISTER_MAP['SYSTEM_STATUS'],
+                    count=1,
+                    device_id=self.unit_id
+                )
+            if result.isError():
+                return False
+            self._last_ok_ts = time.time()
+            return True
         except:
             return False
     
     def reconnect(self) -> bool:
         """重新连接"""
         logger.info("尝试重新连接PLC...")
-        self.disconnect()
-        return self.connect()
+        # 持锁重连：多个线程同时失败时串行重建socket，
+        # 避免并发connect互相踩踏、反复断开刚建好的连接
+        with self._io_lock:
+            self.disconnect()
+            return self.connect()
     
     def __enter__(self):
         """上下文管理器入口"""
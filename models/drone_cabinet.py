@@ -6,13 +6,105 @@
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
-from database.connection import db_manager
+from dataclasses import dataclass, fields as dataclass_fields
+import threading
+import time
+from queue import Queue, Empty
+from cachetools import TTLCache
+from database.connection import db_manager, async_db_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# 机器配置读缓存：配置变更频率低，短TTL即可省掉接口热路径上的数据库往返
+_machine_cache = TTLCache(maxsize=512, ttl=60)
+_machine_cache_lock = threading.RLock()
+_ALL_MACHINES_KEY = '__all__'
+
+# 连接配置结果集缓存：ConfigManager的多个入口在同一刷新窗口内
+# 可能并发触发重查，短TTL把这类突发合并成一次数据库往返；
+# 写路径（create/update/update_status/delete）写穿失效
+_CONN_CFG_TTL = 10.0
+_conn_cfg_cache = {'t': 0.0, 'v': None}
+_conn_cfg_lock = threading.Lock()
+
+# SQL常量：语句文本构建一次复用，列表显式写出——SELECT *既让
+# 服务端每次解析都重新展开列，也把调用方不需要的宽列拖下来解码
+# 注：pymysql/aiomysql走MySQL文本协议，没有服务端预编译语句可用，
+# 这里能省的是每次调用重建语句字符串的开销
+_COLS_MACHINE = "id, machine_name, host, port, description, is_active"
+_COLS_CABINET = (
+    "id, name, code, ip, port, slave_id, address, longitude, latitude, "
+    "status, total_boxes, available_boxes, last_online_time, "
+    "last_offline_time, last_error_time, error_message, remark, creator, "
+    "create_time, updater, update_time, deleted, tenant_id"
+)
+_COLS_LOG = ("id, cabinet_id, operation_type, operation_result, "
+             "error_message, operator, operation_time, remark")
+
+_SQL_ALL_MACHINES = f"SELECT {_COLS_MACHINE} FROM machine_config ORDER BY id"
+_SQL_MACHINE_BY_NAME = f"SELECT {_COLS_MACHINE} FROM machine_config WHERE machine_name = %s"
+_SQL_ALL_ACTIVE_CABINETS = (
+    f"SELECT {_COLS_CABINET} FROM drone_cabinet "
+    "WHERE deleted = 0 AND status IN (1, 2) ORDER BY create_time DESC"
+)
+_SQL_CABINET_BY_CODE = f"SELECT {_COLS_CABINET} FROM drone_cabinet WHERE code = %s AND deleted = 0"
+_SQL_CABINET_BY_ID = f"SELECT {_COLS_CABINET} FROM drone_cabinet WHERE id = %s AND deleted = 0"
+_SQL_LOGS_BY_CABINET = (
+    f"SELECT {_COLS_LOG} FROM drone_cabinet_log "
+    "WHERE cabinet_id = %s ORDER BY operation_time DESC LIMIT %s"
+)
+_SQL_INSERT_MACHINE = (
+    "INSERT INTO machine_config "
+    "(machine_name, host, port, description, is_active) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+_SQL_DELETE_MACHINE = "DELETE FROM machine_config WHERE machine_name = %s"
+# 状态更新合并成一条语句：NOW()落到哪个时间列、错误信息怎么处理
+# 都由SQL端的IF按状态判定，Python侧只剩一条路径、一份语句文本
+_SQL_UPDATE_STATUS = (
+    "UPDATE drone_cabinet SET "
+    "status = %s, "
+    "last_online_time = IF(%s = 1, NOW(), last_online_time), "
+    "last_offline_time = IF(%s = 0, NOW(), last_offline_time), "
+    "last_error_time = IF(%s NOT IN (0, 1), NOW(), last_error_time), "
+    "error_message = IF(%s NOT IN (0, 1), %s, IF(%s = 1, NULL, error_message)) "
+    "WHERE id = %s AND deleted = 0"
+)
+_SQL_INSERT_LOG = (
+    "INSERT INTO drone_cabinet_log "
+    "(cabinet_id, operation_type, operation_result, error_message, operator, remark) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+# to_dict统一的时间格式：字段展开为字面量后只在已知的datetime字段上
+# 格式化一次，不再对每个值做isinstance分派
+_FMT = '%Y-%m-%d %H:%M:%S'
+
+# from_dict需要还原的datetime字段
+_DATETIME_FIELDS = ('last_online_time', 'last_offline_time', 'last_error_time',
+                    'create_time', 'update_time')
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    """解析'YYYY-MM-DD HH:MM:SS'格式的时间串
+
+    标准19字符格式直接按固定位置切片取整构造，省掉格式推断；
+    其他长度交给fromisoformat（C实现，仍比strptime快一个量级，
+    strptime每次都要重新解析格式串并持有locale锁）。畸形输入
+    两条路径都以ValueError落回None。
+    """
+    try:
+        if len(value) == 19:
+            return datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19])
+            )
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+@dataclass(slots=True)
 class DroneCabinet:
     """无人机柜模型"""
     id: Optional[int] = None
@@ -40,34 +132,107 @@ class DroneCabinet:
     tenant_id: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, datetime):
-                result[key] = value.strftime('%Y-%m-%d %H:%M:%S') if value else None
-            else:
-                result[key] = value
-        return result
-    
+        """转换为字典（字段手工展开，datetime字段就地格式化）"""
+        last_online = self.last_online_time
+        last_offline = self.last_offline_time
+        last_error = self.last_error_time
+        created = self.create_time
+        updated = self.update_time
+        return {
+            'id': self.id,
+            'name': self.name,
+            'code': self.code,
+            'ip': self.ip,
+            'port': self.port,
+            'slave_id': self.slave_id,
+            'address': self.address,
+            'longitude': self.longitude,
+            'latitude': self.latitude,
+            'status': self.status,
+            'total_boxes': self.total_boxes,
+            'available_boxes': self.available_boxes,
+            'last_online_time': last_online.strftime(_FMT) if last_online else None,
+            'last_offline_time': last_offline.strftime(_FMT) if last_offline else None,
+            'last_error_time': last_error.strftime(_FMT) if last_error else None,
+            'error_message': self.error_message,
+            'remark': self.remark,
+            'creator': self.creator,
+            'create_time': created.strftime(_FMT) if created else None,
+            'updater': self.updater,
+            'update_time': updated.strftime(_FMT) if updated else None,
+            'deleted': self.deleted,
+            'tenant_id': self.tenant_id,
+        }
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DroneCabinet':
-        """从字典创建对象"""
+        """从字典创建对象（不修改调用方传入的字典）"""
+        cleaned = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+
         # 处理datetime字段
-        datetime_fields = ['last_online_time', 'last_offline_time', 'last_error_time', 'create_time', 'update_time']
-        for field in datetime_fields:
-            if field in data and data[field] and isinstance(data[field], str):
-                try:
-                    data[field] = datetime.strptime(data[field], '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    data[field] = None
-        
+        for field in _DATETIME_FIELDS:
+            value = cleaned.get(field)
+            if value and isinstance(value, str):
+                cleaned[field] = _parse_datetime(value)
+
         # 处理deleted字段（bit类型）
-        if 'deleted' in data:
-            data['deleted'] = bool(data['deleted'])
-        
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        if 'deleted' in cleaned:
+            cleaned['deleted'] = bool(cleaned['deleted'])
+
+        return cls(**cleaned)
+
+    @classmethod
+    def _from_row_fast(cls, row: Dict[str, Any]) -> 'DroneCabinet':
+        """从数据库行构建对象的快路径
 
-@dataclass
+        DAO查询的列名与字段同名，按导入时捕获的字段表直接赋值，
+        跳过from_dict每行每列的__dataclass_fields__过滤和kwargs
+        展开；datetime列由驱动原生返回datetime，仅字符串才解析。
+        """
+        obj = cls.__new__(cls)
+        get = row.get
+        for name in _CABINET_FIELDS:
+            setattr(obj, name, get(name, _CABINET_DEFAULTS[name]))
+        for name in _DATETIME_FIELDS:
+            value = getattr(obj, name)
+            if value and isinstance(value, str):
+                setattr(obj, name, _parse_datetime(value))
+        obj.deleted = bool(obj.deleted)
+        return obj
+
+    @classmethod
+    def _make_row_plan(cls, columns: tuple) -> list:
+        """按查询结果列序预编译一份物化计划
+
+        计划是[(字段名, 列下标或None)]，列名匹配、字典查找这些
+        每行不变的工作在每个结果集只做一次，_from_row_tuple剩下
+        纯粹的按位取值加setattr。
+        """
+        idx = {c: i for i, c in enumerate(columns)}
+        return [(name, idx.get(name)) for name in _CABINET_FIELDS]
+
+    @classmethod
+    def _from_row_tuple(cls, row: tuple, plan: list) -> 'DroneCabinet':
+        """从元组行构建对象（配合execute_query_tuple使用）
+
+        plan由_make_row_plan按结果集预编译一次，整个结果集
+        无需为每行物化中间字典或重复做列名查找。
+        """
+        obj = cls.__new__(cls)
+        for name, i in plan:
+            setattr(obj, name, row[i] if i is not None else _CABINET_DEFAULTS[name])
+        for name in _DATETIME_FIELDS:
+            value = getattr(obj, name)
+            if value and isinstance(value, str):
+                setattr(obj, name, _parse_datetime(value))
+        obj.deleted = bool(obj.deleted)
+        return obj
+
+# 快路径物化用的字段表与默认值（导入时捕获一次）
+_CABINET_FIELDS = tuple(DroneCabinet.__dataclass_fields__)
+_CABINET_DEFAULTS = {f.name: f.default for f in dataclass_fields(DroneCabinet)}
+
+@dataclass(slots=True)
 class DroneCabinetLog:
     """无人机柜操作日志模型"""
     id: Optional[int] = None
@@ -78,18 +243,22 @@ class DroneCabinetLog:
     operator: str = ''
     operation_time: Optional[datetime] = None
     remark: Optional[str] = None
-    
+
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, datetime):
-                result[key] = value.strftime('%Y-%m-%d %H:%M:%S') if value else None
-            else:
-                result[key] = value
-        return result
-
-@dataclass
+        """转换为字典（字段手工展开，datetime字段就地格式化）"""
+        op_time = self.operation_time
+        return {
+            'id': self.id,
+            'cabinet_id': self.cabinet_id,
+            'operation_type': self.operation_type,
+            'operation_result': self.operation_result,
+            'error_message': self.error_message,
+            'operator': self.operator,
+            'operation_time': op_time.strftime(_FMT) if op_time else None,
+            'remark': self.remark,
+        }
+
+@dataclass(slots=True)
 class DroneCabinetBox:
     """无人机柜格口模型"""
     id: Optional[int] = None
@@ -107,31 +276,62 @@ class DroneCabinetBox:
     update_time: Optional[datetime] = None
     deleted: bool = False
     tenant_id: int = 0
-    
+
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, datetime):
-                result[key] = value.strftime('%Y-%m-%d %H:%M:%S') if value else None
-            else:
-                result[key] = value
-        return result
+        """转换为字典（字段手工展开，datetime字段就地格式化）"""
+        last_op = self.last_operation_time
+        created = self.create_time
+        updated = self.update_time
+        return {
+            'id': self.id,
+            'cabinet_id': self.cabinet_id,
+            'box_no': self.box_no,
+            'status': self.status,
+            'package_code': self.package_code,
+            'pickup_code': self.pickup_code,
+            'last_operation_time': last_op.strftime(_FMT) if last_op else None,
+            'last_operation_type': self.last_operation_type,
+            'remark': self.remark,
+            'creator': self.creator,
+            'create_time': created.strftime(_FMT) if created else None,
+            'updater': self.updater,
+            'update_time': updated.strftime(_FMT) if updated else None,
+            'deleted': self.deleted,
+            'tenant_id': self.tenant_id,
+        }
 
 class DroneCabinetDAO:
     """无人机柜数据访问对象"""
-    
+
+    # 实例池：{id: (update_time, 实例)}。活跃柜集合在稳态下几乎
+    # 不变，update_time未动的行直接复用上次物化的实例，重复的
+    # get_all_active不再整列表重新分配对象；写路径整池清空
+    _instance_pool = {}
+    _instance_pool_lock = threading.Lock()
+
     @staticmethod
     def get_all_active() -> List[DroneCabinet]:
         """获取所有活跃的无人机柜"""
         try:
-            sql = """
-                SELECT * FROM drone_cabinet 
-                WHERE deleted = 0 AND status IN (1, 2)
-                ORDER BY create_time DESC
-            """
-            results = db_manager.execute_query(sql)
-            return [DroneCabinet.from_dict(row) for row in results]
+            columns, rows = db_manager.execute_query_tuple(_SQL_ALL_ACTIVE_CABINETS)
+            plan = DroneCabinet._make_row_plan(columns)
+            idx = {c: i for i, c in enumerate(columns)}
+            id_i = idx['id']
+            ut_i = idx.get('update_time')
+
+            cabinets = []
+            with DroneCabinetDAO._instance_pool_lock:
+                pool = DroneCabinetDAO._instance_pool
+                for row in rows:
+                    version = row[ut_i] if ut_i is not None else None
+                    cached = pool.get(row[id_i])
+                    if cached is not None and version is not None and cached[0] == version:
+                        cabinets.append(cached[1])
+                        continue
+                    obj = DroneCabinet._from_row_tuple(row, plan)
+                    pool[row[id_i]] = (version, obj)
+                    cabinets.append(obj)
+            return cabinets
         except Exception as e:
             logger.error(f"获取活跃无人机柜失败: {e}")
             return []
@@ -140,10 +340,9 @@ class DroneCabinetDAO:
     def get_by_code(code: str) -> Optional[DroneCabinet]:
         """根据编号获取无人机柜"""
         try:
-            sql = "SELECT * FROM drone_cabinet WHERE code = %s AND deleted = 0"
-            results = db_manager.execute_query(sql, (code,))
+            results = db_manager.execute_query(_SQL_CABINET_BY_CODE, (code,))
             if results:
-                return DroneCabinet.from_dict(results[0])
+                return DroneCabinet._from_row_fast(results[0])
             return None
         except Exception as e:
             logger.error(f"根据编号获取无人机柜失败: {e}")
@@ -153,10 +352,9 @@ class DroneCabinetDAO:
     def get_by_id(cabinet_id: int) -> Optional[DroneCabinet]:
         """根据ID获取无人机柜"""
         try:
-            sql = "SELECT * FROM drone_cabinet WHERE id = %s AND deleted = 0"
-            results = db_manager.execute_query(sql, (cabinet_id,))
+            results = db_manager.execute_query(_SQL_CABINET_BY_ID, (cabinet_id,))
             if results:
-                return DroneCabinet.from_dict(results[0])
+                return DroneCabinet._from_row_fast(results[0])
             return None
         except Exception as e:
             logger.error(f"根据ID获取无人机柜失败: {e}")
@@ -183,6 +381,7 @@ class DroneCabinetDAO:
                 cursor = conn.cursor()
                 cursor.execute(sql, params)
                 conn.commit()
+                DroneCabinetDAO.invalidate_connection_configs()
                 return cursor.lastrowid
         except Exception as e:
             logger.error(f"创建无人机柜失败: {e}")
@@ -207,6 +406,7 @@ class DroneCabinetDAO:
             )
             
             result = db_manager.execute_update(sql, params)
+            DroneCabinetDAO.invalidate_connection_configs()
             return result > 0
         except Exception as e:
             logger.error(f"更新无人机柜失败: {e}")
@@ -214,54 +414,116 @@ class DroneCabinetDAO:
     
     @staticmethod
     def update_status(cabinet_id: int, status: int, error_message: str = None) -> bool:
-        """更新无人机柜状态"""
+        """更新无人机柜状态（0-离线 1-在线 其他-故障）"""
         try:
-            if status == 1:  # 在线
-                sql = """
-                    UPDATE drone_cabinet SET 
-                    status = %s, last_online_time = NOW(), error_message = NULL
-                    WHERE id = %s AND deleted = 0
-                """
-                params = (status, cabinet_id)
-            elif status == 0:  # 离线
-                sql = """
-                    UPDATE drone_cabinet SET 
-                    status = %s, last_offline_time = NOW()
-                    WHERE id = %s AND deleted = 0
-                """
-                params = (status, cabinet_id)
-            else:  # 故障
-                sql = """
-                    UPDATE drone_cabinet SET 
-                    status = %s, last_error_time = NOW(), error_message = %s
-                    WHERE id = %s AND deleted = 0
-                """
-                params = (status, error_message, cabinet_id)
-            
-            result = db_manager.execute_update(sql, params)
+            params = (status, status, status, status,
+                      status, error_message, status, cabinet_id)
+            result = db_manager.execute_update(_SQL_UPDATE_STATUS, params)
+            DroneCabinetDAO.invalidate_connection_configs()
             return result > 0
         except Exception as e:
             logger.error(f"更新无人机柜状态失败: {e}")
             return False
     
+    @staticmethod
+    def update_status_batch(items: List[tuple]) -> int:
+        """批量更新无人机柜状态
+
+        健康巡检一轮对N台机器逐台调update_status是N次往返加
+        N次提交；按状态分组后每组一条语句，整轮收敛到至多三次。
+
+        Args:
+            items: [(cabinet_id, status, error_message), ...]，
+                   error_message仅故障状态使用
+
+        Returns:
+            int: 受影响的总行数
+        """
+        if not items:
+            return 0
+
+        online = [cid for cid, status, _ in items if status == 1]
+        offline = [cid for cid, status, _ in items if status == 0]
+        faulty = [(cid, status, msg) for cid, status, msg in items if status not in (0, 1)]
+
+        affected = 0
+        try:
+            if online:
+                placeholders = ", ".join(["%s"] * len(online))
+                sql = (
+                    "UPDATE drone_cabinet SET "
+                    "status = 1, last_online_time = NOW(), error_message = NULL "
+                    f"WHERE id IN ({placeholders}) AND deleted = 0"
+                )
+                affected += db_manager.execute_update(sql, tuple(online))
+
+            if offline:
+                placeholders = ", ".join(["%s"] * len(offline))
+                sql = (
+                    "UPDATE drone_cabinet SET "
+                    "status = 0, last_offline_time = NOW() "
+                    f"WHERE id IN ({placeholders}) AND deleted = 0"
+                )
+                affected += db_manager.execute_update(sql, tuple(offline))
+
+            if faulty:
+                ids = [cid for cid, _, _ in faulty]
+                placeholders = ", ".join(["%s"] * len(ids))
+                case = " ".join(["WHEN %s THEN %s"] * len(faulty))
+                sql = (
+                    "UPDATE drone_cabinet SET "
+                    f"status = CASE id {case} END, "
+                    "last_error_time = NOW(), "
+                    f"error_message = CASE id {case} END "
+                    f"WHERE id IN ({placeholders}) AND deleted = 0"
+                )
+                params = []
+                for cid, status, _ in faulty:
+                    params.extend((cid, status))
+                for cid, _, msg in faulty:
+                    params.extend((cid, msg))
+                params.extend(ids)
+                affected += db_manager.execute_update(sql, tuple(params))
+
+            DroneCabinetDAO.invalidate_connection_configs()
+            return affected
+        except Exception as e:
+            logger.error(f"批量更新无人机柜状态失败: {e}")
+            return affected
+
     @staticmethod
     def delete(cabinet_id: int) -> bool:
         """删除无人机柜（软删除）"""
         try:
             sql = "UPDATE drone_cabinet SET deleted = 1 WHERE id = %s"
             result = db_manager.execute_update(sql, (cabinet_id,))
+            DroneCabinetDAO.invalidate_connection_configs()
             return result > 0
         except Exception as e:
             logger.error(f"删除无人机柜失败: {e}")
             return False
     
+    @staticmethod
+    def invalidate_connection_configs():
+        """失效连接配置缓存和实例池（柜子写入后调用）"""
+        with _conn_cfg_lock:
+            _conn_cfg_cache['v'] = None
+            _conn_cfg_cache['t'] = 0.0
+        with DroneCabinetDAO._instance_pool_lock:
+            DroneCabinetDAO._instance_pool.clear()
+
     @staticmethod
     def get_connection_configs() -> Dict[str, Dict[str, Any]]:
-        """获取所有机器的连接配置"""
+        """获取所有机器的连接配置（短TTL缓存）"""
+        with _conn_cfg_lock:
+            if (_conn_cfg_cache['v'] is not None
+                    and time.time() - _conn_cfg_cache['t'] < _CONN_CFG_TTL):
+                return _conn_cfg_cache['v']
+
         try:
             sql = """
-                SELECT code, ip, port, slave_id, status 
-                FROM drone_cabinet 
+                SELECT code, ip, port, slave_id, status
+                FROM drone_cabinet
                 WHERE deleted = 0 AND status IN (1, 2)
             """
             results = db_manager.execute_query(sql)
@@ -274,62 +536,242 @@ class DroneCabinetDAO:
                     'unit_id': row['slave_id'],
                     'status': row['status']
                 }
-            
+
+            with _conn_cfg_lock:
+                _conn_cfg_cache['v'] = configs
+                _conn_cfg_cache['t'] = time.time()
             return configs
         except Exception as e:
             logger.error(f"获取连接配置失败: {e}")
             return {}
 
+    # ==================== 机器配置（machine_config表）异步方法 ====================
+    # 供FastAPI接口调用，基于异步连接池，避免阻塞事件循环
+
+    @staticmethod
+    def _cache_get(key):
+        """读取机器配置缓存"""
+        with _machine_cache_lock:
+            return _machine_cache.get(key)
+
+    @staticmethod
+    def _cache_set(key, value):
+        """写入机器配置缓存"""
+        with _machine_cache_lock:
+            _machine_cache[key] = value
+
+    @staticmethod
+    def _cache_invalidate(machine_name: str = None):
+        """失效机器配置缓存（配置写入后调用）"""
+        with _machine_cache_lock:
+            if machine_name is not None:
+                _machine_cache.pop(machine_name, None)
+            _machine_cache.pop(_ALL_MACHINES_KEY, None)
+
+    @staticmethod
+    async def get_all_machines() -> List[Dict[str, Any]]:
+        """获取所有机器配置"""
+        cached = DroneCabinetDAO._cache_get(_ALL_MACHINES_KEY)
+        if cached is not None:
+            return cached
+
+        try:
+            results = await async_db_manager.execute_query(_SQL_ALL_MACHINES)
+            DroneCabinetDAO._cache_set(_ALL_MACHINES_KEY, results)
+            return results
+        except Exception as e:
+            logger.error(f"获取机器配置失败: {e}")
+            return []
+
+    @staticmethod
+    async def get_machine_by_name(machine_name: str) -> Optional[Dict[str, Any]]:
+        """根据名称获取机器配置"""
+        cached = DroneCabinetDAO._cache_get(machine_name)
+        if cached is not None:
+            return cached
+
+        try:
+            results = await async_db_manager.execute_query(_SQL_MACHINE_BY_NAME, (machine_name,))
+            if results:
+                DroneCabinetDAO._cache_set(machine_name, results[0])
+                return results[0]
+            return None
+        except Exception as e:
+            logger.error(f"根据名称获取机器配置失败: {e}")
+            return None
+
+    @staticmethod
+    async def get_machines_by_names(names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取机器配置（单次IN查询代替逐台查询）
+
+        Args:
+            names: 机器名称列表
+
+        Returns:
+            Dict: {machine_name: 配置行}，未找到的名称不出现在结果中
+        """
+        if not names:
+            return {}
+
+        try:
+            placeholders = ", ".join(["%s"] * len(names))
+            sql = f"SELECT {_COLS_MACHINE} FROM machine_config WHERE machine_name IN ({placeholders})"
+            results = await async_db_manager.execute_query(sql, tuple(names))
+
+            machines = {}
+            for row in results:
+                machines[row['machine_name']] = row
+                # 顺带填充单机缓存，后续get_machine_by_name直接命中
+                DroneCabinetDAO._cache_set(row['machine_name'], row)
+
+            return machines
+        except Exception as e:
+            logger.error(f"批量获取机器配置失败: {e}")
+            return {}
+
+    @staticmethod
+    async def create_machine(data: Dict[str, Any]) -> Optional[int]:
+        """创建机器配置"""
+        try:
+            params = (
+                data['machine_name'], data['host'], data['port'],
+                data.get('description'), data.get('is_active', True)
+            )
+
+            async with async_db_manager.get_connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(_SQL_INSERT_MACHINE, params)
+                    await conn.commit()
+                    DroneCabinetDAO._cache_invalidate(data['machine_name'])
+                    return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"创建机器配置失败: {e}")
+            return None
+
+    @staticmethod
+    async def update_machine(machine_name: str, data: Dict[str, Any]) -> bool:
+        """更新机器配置"""
+        try:
+            allowed_fields = ['host', 'port', 'description', 'is_active']
+            set_clauses = []
+            params = []
+            for field in allowed_fields:
+                if field in data:
+                    set_clauses.append(f"{field} = %s")
+                    params.append(data[field])
+
+            if not set_clauses:
+                return False
+
+            sql = f"UPDATE machine_config SET {', '.join(set_clauses)} WHERE machine_name = %s"
+            params.append(machine_name)
+
+            result = await async_db_manager.execute_update(sql, tuple(params))
+            DroneCabinetDAO._cache_invalidate(machine_name)
+            return result > 0
+        except Exception as e:
+            logger.error(f"更新机器配置失败: {e}")
+            return False
+
+    @staticmethod
+    async def delete_machine(machine_name: str) -> bool:
+        """删除机器配置"""
+        try:
+            result = await async_db_manager.execute_update(_SQL_DELETE_MACHINE, (machine_name,))
+            DroneCabinetDAO._cache_invalidate(machine_name)
+            return result > 0
+        except Exception as e:
+            logger.error(f"删除机器配置失败: {e}")
+            return False
+
 class DroneCabinetLogDAO:
     """无人机柜日志数据访问对象"""
-    
+
+    # 异步写缓冲：攒满一批或超时即落库，柜机操作后的日志突发
+    # 从每条一次往返/一次提交收敛到每批一次
+    _FLUSH_BATCH = 100
+    _FLUSH_INTERVAL = 0.5
+    _log_queue = None
+    _writer_lock = threading.Lock()
+
     @staticmethod
     def create_log(log: DroneCabinetLog) -> bool:
         """创建操作日志"""
         try:
-            sql = """
-                INSERT INTO drone_cabinet_log 
-                (cabinet_id, operation_type, operation_result, error_message, operator, remark)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
             params = (
                 log.cabinet_id, log.operation_type, log.operation_result,
                 log.error_message, log.operator, log.remark
             )
-            
-            result = db_manager.execute_update(sql, params)
+
+            result = db_manager.execute_update(_SQL_INSERT_LOG, params)
             return result > 0
         except Exception as e:
             logger.error(f"创建操作日志失败: {e}")
             return False
+
+    @staticmethod
+    def create_logs_batch(logs: List[DroneCabinetLog]) -> int:
+        """批量创建操作日志（单事务executemany）
+
+        Returns:
+            int: 成功插入的行数
+        """
+        if not logs:
+            return 0
+        try:
+            params_list = [
+                (log.cabinet_id, log.operation_type, log.operation_result,
+                 log.error_message, log.operator, log.remark)
+                for log in logs
+            ]
+            return db_manager.execute_batch(_SQL_INSERT_LOG, params_list) or len(params_list)
+        except Exception as e:
+            logger.error(f"批量创建操作日志失败: {e}")
+            return 0
+
+    @classmethod
+    def log_async(cls, log: DroneCabinetLog):
+        """入队异步写日志（不阻塞调用方）
+
+        后台线程按_FLUSH_BATCH条或_FLUSH_INTERVAL秒为一批落库。
+        """
+        if cls._log_queue is None:
+            with cls._writer_lock:
+                if cls._log_queue is None:
+                    cls._log_queue = Queue()
+                    writer = threading.Thread(
+                        target=cls._flush_loop, name="cabinet-log-writer", daemon=True
+                    )
+                    writer.start()
+        cls._log_queue.put(log)
+
+    @classmethod
+    def _flush_loop(cls):
+        """日志写线程：攒批后调create_logs_batch"""
+        while True:
+            batch = [cls._log_queue.get()]
+            deadline = time.monotonic() + cls._FLUSH_INTERVAL
+            while len(batch) < cls._FLUSH_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(cls._log_queue.get(timeout=remaining))
+                except Empty:
+                    break
+            cls.create_logs_batch(batch)
     
     @staticmethod
     def get_logs_by_cabinet(cabinet_id: int, limit: int = 100) -> List[DroneCabinetLog]:
-        """获取指定柜子的操作日志"""
+        """获取指定柜子的操作日志
+
+        查询列序与DroneCabinetLog字段声明顺序一致，元组行直接
+        按位展开构造，省掉每行八次字典查找；operation_time由
+        驱动原生返回datetime，无需解析。
+        """
         try:
-            sql = """
-                SELECT * FROM drone_cabinet_log 
-                WHERE cabinet_id = %s 
-                ORDER BY operation_time DESC 
-                LIMIT %s
-            """
-            results = db_manager.execute_query(sql, (cabinet_id, limit))
-            
-            logs = []
-            for row in results:
-                log = DroneCabinetLog(
-                    id=row['id'],
-                    cabinet_id=row['cabinet_id'],
-                    operation_type=row['operation_type'],
-                    operation_result=row['operation_result'],
-                    error_message=row['error_message'],
-                    operator=row['operator'],
-                    operation_time=row['operation_time'],
-                    remark=row['remark']
-                )
-                logs.append(log)
-            
-            return logs
+            _, rows = db_manager.execute_query_tuple(_SQL_LOGS_BY_CABINET, (cabinet_id, limit))
+            return [DroneCabinetLog(*row) for row in rows]
         except Exception as e:
             logger.error(f"获取操作日志失败: {e}")
             return []
\ No newline at end of file
@@ -6,6 +6,7 @@
 
 import threading
 import time
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 import logging
 from models.drone_cabinet import DroneCabinetDAO
@@ -13,39 +14,75 @@ from config import PLC_CONFIG, REGISTER_MAP
 
 logger = logging.getLogger(__name__)
 
+# 可用状态集合：1-在线 2-故障（故障机器仍可连接做诊断）
+_AVAILABLE_STATUSES = frozenset((1, 2))
+
 class ConfigManager:
     """配置管理器 - 混合数据库和文件配置"""
     
     _instance = None
     _lock = threading.Lock()
-    
+    # 初始化哨兵放在类上：不依赖实例__dict__，模型全面加槽后
+    # hasattr-on-self这类写法不再可靠
+    _initialized = False
+
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
-        if not hasattr(self, 'initialized'):
+        if not ConfigManager._initialized:
             self._db_configs = {}  # 数据库配置缓存
             self._file_configs = {}  # 文件配置缓存
+            # 预合并的机器配置只读视图：{机器名: MappingProxyType}，
+            # 热路径按名取现成视图，不再每次copy+update
+            self._merged_cache = {}
+            self._registers_view = MappingProxyType({})
+            # 预计算的状态表和可用集：读方法退化为一次哈希查找
+            self._status_map = {'default': 1}
+            self._available_set = frozenset({'default'})
             self._last_refresh = 0
             self._refresh_interval = 60  # 60秒刷新一次
-            self._refresh_lock = threading.Lock()
-            
+            # 配置版本号：每次成功刷新递增，调用方可据此判断
+            # 自己缓存的派生数据是否过期
+            self._version = 0
+            # 手动刷新信号：refresh_config只置事件，刷新本身始终
+            # 在后台线程里做，读路径完全无锁
+            self._refresh_event = threading.Event()
+
             # 初始化配置
             self._load_file_configs()
             self._refresh_db_configs()
-            
-            self.initialized = True
+
+            # 后台定时刷新：读方直接取已发布的字典（CPython下属性
+            # 赋值是原子的指针替换），热路径不再做时间比较和加锁
+            refresher = threading.Thread(
+                target=self._refresh_loop, name="config-refresher", daemon=True
+            )
+            refresher.start()
+
+            ConfigManager._initialized = True
+
+    def _refresh_loop(self):
+        """后台刷新循环（定时或被refresh_config唤醒）"""
+        while True:
+            self._refresh_event.wait(timeout=self._refresh_interval)
+            self._refresh_event.clear()
+            self._refresh_db_configs()
     
     def _load_file_configs(self):
-        """加载文件配置"""
+        """加载文件配置
+
+        REGISTER_MAP本身已是只读映射，直接复用同一视图即可，
+        不再为寄存器表做任何拷贝；调用方不得改写。
+        """
         try:
             self._file_configs = {
                 'PLC_CONFIG': PLC_CONFIG.copy(),
-                'MODBUS_REGISTERS': REGISTER_MAP.copy()
+                'MODBUS_REGISTERS': REGISTER_MAP
             }
             logger.info("文件配置加载成功")
         except Exception as e:
@@ -58,99 +95,89 @@ class ConfigManager:
                     'timeout': 3,
                     'retry_count': 3
                 },
-                'MODBUS_REGISTERS': {}
+                'MODBUS_REGISTERS': MappingProxyType({})
             }
-    
+        self._registers_view = self._file_configs['MODBUS_REGISTERS']
+
     def _refresh_db_configs(self):
         """刷新数据库配置"""
         try:
             self._db_configs = DroneCabinetDAO.get_connection_configs()
+            self._rebuild_merged_cache()
+            self._version += 1
             self._last_refresh = time.time()
             logger.info(f"数据库配置刷新成功，共加载 {len(self._db_configs)} 个机器配置")
         except Exception as e:
             logger.error(f"刷新数据库配置失败: {e}")
-    
-    def _ensure_fresh_config(self):
-        """确保配置是最新的"""
-        current_time = time.time()
-        if current_time - self._last_refresh > self._refresh_interval:
-            with self._refresh_lock:
-                # 双重检查
-                if current_time - self._last_refresh > self._refresh_interval:
-                    self._refresh_db_configs()
+
+    def _rebuild_merged_cache(self):
+        """重建每台机器的合并配置视图
+
+        合并（文件配置+数据库连接信息）只在刷新时做一次，
+        get_plc_config按名返回只读视图即可。
+        """
+        base = self._file_configs['PLC_CONFIG']
+        merged = {'default': MappingProxyType(dict(base))}
+        for machine_name, db_config in self._db_configs.items():
+            config = dict(base)
+            config.update({
+                'host': db_config['host'],
+                'port': db_config['port'],
+                'unit_id': db_config['unit_id']
+            })
+            merged[machine_name] = MappingProxyType(config)
+        self._merged_cache = merged
+
+        # 状态表与可用集同步重建（default始终在线）
+        status_map = {name: cfg.get('status', 0) for name, cfg in self._db_configs.items()}
+        status_map['default'] = 1
+        self._status_map = status_map
+        self._available_set = frozenset(
+            name for name, status in status_map.items() if status in _AVAILABLE_STATUSES
+        )
     
     def get_machine_list(self) -> list:
         """获取所有可用机器列表"""
-        self._ensure_fresh_config()
         machines = list(self._db_configs.keys())
         if not machines:
             machines = ['default']  # 默认机器
         return machines
     
     def get_plc_config(self, machine_name: str = 'default') -> Dict[str, Any]:
-        """获取PLC配置（混合数据库和文件配置）"""
-        self._ensure_fresh_config()
-        
-        # 从文件配置开始
-        config = self._file_configs['PLC_CONFIG'].copy()
-        
-        # 如果是默认机器且没有数据库配置，直接返回文件配置
-        if machine_name == 'default' and not self._db_configs:
+        """获取PLC配置（混合数据库和文件配置，返回只读视图）"""
+
+        config = self._merged_cache.get(machine_name)
+        if config is not None:
             return config
-        
-        # 尝试从数据库获取连接配置
-        if machine_name in self._db_configs:
-            db_config = self._db_configs[machine_name]
-            # 数据库配置覆盖文件配置中的连接信息
-            config.update({
-                'host': db_config['host'],
-                'port': db_config['port'],
-                'unit_id': db_config['unit_id']
-            })
-            logger.debug(f"使用机器 {machine_name} 的数据库配置: {db_config}")
-        elif machine_name != 'default':
+
+        if machine_name != 'default':
             logger.warning(f"未找到机器 {machine_name} 的配置，使用默认配置")
-        
-        return config
-    
+        return self._merged_cache.get('default', MappingProxyType(dict(self._file_configs['PLC_CONFIG'])))
+
     def get_modbus_registers(self) -> Dict[str, Any]:
-        """获取Modbus寄存器配置（来自文件）"""
-        return self._file_configs['MODBUS_REGISTERS'].copy()
+        """获取Modbus寄存器配置（来自文件，返回只读视图）"""
+        return self._registers_view
     
     def is_machine_available(self, machine_name: str) -> bool:
-        """检查机器是否可用"""
-        self._ensure_fresh_config()
-        
-        if machine_name == 'default':
-            return True
-        
-        if machine_name in self._db_configs:
-            status = self._db_configs[machine_name].get('status', 0)
-            return status in [1, 2]  # 在线或故障状态都认为可用
-        
-        return False
-    
+        """检查机器是否可用（在线或故障都算可用，刷新时预算好）"""
+        return machine_name in self._available_set
+
     def get_machine_status(self, machine_name: str) -> int:
-        """获取机器状态"""
-        self._ensure_fresh_config()
-        
-        if machine_name == 'default':
-            return 1  # 默认机器始终在线
-        
-        if machine_name in self._db_configs:
-            return self._db_configs[machine_name].get('status', 0)
-        
-        return 0  # 未知机器视为离线
+        """获取机器状态（未知机器视为离线）"""
+        return self._status_map.get(machine_name, 0)
+
+    @property
+    def version(self) -> int:
+        """当前配置版本（单调递增，刷新成功时+1）"""
+        return self._version
     
     def refresh_config(self):
-        """手动刷新配置"""
-        with self._refresh_lock:
-            self._refresh_db_configs()
-            logger.info("配置已手动刷新")
+        """手动刷新配置（唤醒后台刷新线程）"""
+        self._refresh_event.set()
+        logger.info("已触发配置刷新")
     
     def get_all_configs(self) -> Dict[str, Dict[str, Any]]:
         """获取所有机器的完整配置"""
-        self._ensure_fresh_config()
         
         all_configs = {}
         
@@ -175,7 +202,6 @@ class ConfigManager:
     
     def get_config_summary(self) -> Dict[str, Any]:
         """获取配置摘要信息"""
-        self._ensure_fresh_config()
         
         return {
             'total_machines': len(self._db_configs) + 1,  # +1 for default
@@ -186,5 +212,15 @@ class ConfigManager:
             'machine_list': self.get_machine_list()
         }
 
-# 全局配置管理器实例
-config_manager = ConfigManager()
\ No newline at end of file
+# 全局配置管理器实例：延迟到首次访问才构建（PEP 562），
+# import本模块不再触发数据库查询，进程启动不被DB可用性卡住
+_cm: Optional[ConfigManager] = None
+
+
+def __getattr__(name):
+    if name == 'config_manager':
+        global _cm
+        if _cm is None:
+            _cm = ConfigManager()
+        return _cm
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
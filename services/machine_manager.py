@@ -4,8 +4,10 @@
 支持多机器连接管理和操作
 """
 
+import asyncio
 import threading
 import time
+from contextlib import contextmanager
 from typing import Dict, Optional, Any
 import logging
 from modbus_client import ModbusClient
@@ -15,21 +17,77 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+
+class _RWLock:
+    """简单读写锁：读共享、写独占
+
+    连接表的访问以读为主（取客户端、查状态、统计），写只发生在
+    建连/刷新/清理时。写者等待时阻止新读者进入，避免写者饿死。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writing = False
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
 class MachineConnection:
     """机器连接封装"""
-    
+
     def __init__(self, machine_name: str, config: Dict[str, Any]):
         self.machine_name = machine_name
         self.config = config
         self.client = None
         self.last_used = time.time()
+        # 计数只在持锁的慢路径（建连/重连）里变动，普通int足够；
+        # 免锁快路径不碰计数，无需分片
         self.connection_count = 0
         self.error_count = 0
         self.last_error = None
-        self._lock = threading.Lock()
-    
+        # RLock：慢路径内部可能再进disconnect()等持锁方法，不致自锁
+        self._lock = threading.RLock()
+
     def get_client(self) -> Optional[ModbusClient]:
         """获取Modbus客户端"""
+        # 无锁快路径：稳态下client已连接，只需刷新last_used。
+        # 属性读写在CPython下是原子的，读到稍旧的client最多多走
+        # 一次慢路径，不会产生错误结果
+        c = self.client
+        if c is not None and c.is_connected and c.client and c.client.is_socket_open():
+            self.last_used = time.time()
+            return c
+
+        # 慢路径：构建或重连时才串行化
         with self._lock:
             try:
                 if self.client is None:
@@ -41,7 +99,12 @@ class MachineConnection:
                         retry_count=self.config.get('retry_count', 3)
                     )
                     logger.info(f"为机器 {self.machine_name} 创建Modbus客户端")
-                
+
+                # 锁内复查：可能已被并发线程连好
+                if self.client.is_connected and self.client.client and self.client.client.is_socket_open():
+                    self.last_used = time.time()
+                    return self.client
+
                 # 测试连接
                 if self.client.connect():
                     self.last_used = time.time()
@@ -53,7 +116,7 @@ class MachineConnection:
                     self.last_error = "连接失败"
                     logger.error(f"机器 {self.machine_name} 连接失败")
                     return None
-                    
+
             except Exception as e:
                 self.error_count += 1
                 self.last_error = str(e)
@@ -74,30 +137,35 @@ class MachineConnection:
     
     def is_healthy(self) -> bool:
         """检查连接是否健康"""
-        # 错误率过高认为不健康
-        if self.connection_count > 0:
-            error_rate = self.error_count / (self.connection_count + self.error_count)
+        # 计数取一次快照，错误率过高认为不健康
+        conns = self.connection_count
+        errors = self.error_count
+        if conns > 0:
+            error_rate = errors / (conns + errors)
             return error_rate < 0.5
-        return self.error_count < 5
-    
+        return errors < 5
+
     def get_stats(self) -> Dict[str, Any]:
         """获取连接统计信息"""
+        conns = self.connection_count
+        errors = self.error_count
+
         # 检查连接状态：优先使用客户端的连接状态
         is_connected = False
         if self.client is not None:
             # 直接使用客户端的连接状态，这更可靠
             is_connected = self.client.is_connected
             # 如果连接计数大于0且错误率不高，也认为是连接的
-            if not is_connected and self.connection_count > 0:
-                error_rate = self.error_count / (self.connection_count + self.error_count) if (self.connection_count + self.error_count) > 0 else 1
+            if not is_connected and conns > 0:
+                error_rate = errors / (conns + errors) if (conns + errors) > 0 else 1
                 is_connected = error_rate < 0.3  # 错误率低于30%认为连接正常
-        
+
         return {
             'machine_name': self.machine_name,
             'config': self.config,
             'last_used': self.last_used,
-            'connection_count': self.connection_count,
-            'error_count': self.error_count,
+            'connection_count': conns,
+            'error_count': errors,
             'last_error': self.last_error,
             'is_healthy': self.is_healthy(),
             'connected': is_connected
@@ -119,21 +187,44 @@ class MachineManager:
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self._connections: Dict[str, MachineConnection] = {}
-            self._connection_lock = threading.Lock()
+            # 读写锁：读多写少，读路径（取客户端/查状态）互相不阻塞
+            self._connection_lock = _RWLock()
             self._cleanup_interval = 300  # 5分钟清理一次
             self._last_cleanup = time.time()
-            
+            self._stopped = threading.Event()
+            # 机器编号->柜体ID缓存（写日志时免两次DB往返）
+            self._cabinet_id_cache: Dict[str, Optional[int]] = {}
+
             # 初始化连接
             self._initialize_connections()
-            
+
+            # 空闲连接由专职后台线程回收，请求路径不再顺带扫描
+            reaper = threading.Thread(
+                target=self._reaper_loop, name="machine-conn-reaper", daemon=True
+            )
+            reaper.start()
+
             self.initialized = True
+
+    def _reaper_loop(self):
+        """空闲连接回收循环"""
+        while not self._stopped.wait(timeout=self._cleanup_interval):
+            try:
+                self._cleanup_idle_connections()
+            except Exception as e:
+                logger.error(f"清理空闲连接失败: {e}")
+
+    def shutdown(self):
+        """停止回收线程并断开所有连接"""
+        self._stopped.set()
+        self.disconnect_all()
     
     def _initialize_connections(self):
         """初始化所有机器连接"""
         try:
             all_configs = config_manager.get_all_configs()
             
-            with self._connection_lock:
+            with self._connection_lock.write():
                 for machine_name, machine_config in all_configs.items():
                     if machine_config['available']:
                         plc_config = machine_config['plc_config']
@@ -147,23 +238,24 @@ class MachineManager:
     
     def get_machine_client(self, machine_name: str = 'default') -> Optional[ModbusClient]:
         """获取指定机器的Modbus客户端"""
-        self._cleanup_idle_connections()
-        
-        with self._connection_lock:
-            # 如果连接不存在，尝试创建
-            if machine_name not in self._connections:
-                if not self._create_connection(machine_name):
-                    return None
-            
+        # 读锁快路径：连接已存在时各机器的获取互不阻塞
+        with self._connection_lock.read():
             connection = self._connections.get(machine_name)
-            if connection:
-                client = connection.get_client()
-                if client:
-                    # 记录操作日志
-                    self._log_operation(machine_name, "get_client", 1 if client else 0)
-                return client
-            
-            return None
+
+        if connection is None:
+            with self._connection_lock.write():
+                connection = self._connections.get(machine_name)
+                if connection is None:
+                    if not self._create_connection(machine_name):
+                        return None
+                    connection = self._connections[machine_name]
+
+        # 真正的建连/读写在连接对象自己的锁下进行，不占全局锁
+        client = connection.get_client()
+        if client:
+            # 记录操作日志
+            self._log_operation(machine_name, "get_client", 1)
+        return client
     
     def _create_connection(self, machine_name: str) -> bool:
         """创建新的机器连接"""
@@ -183,17 +275,19 @@ class MachineManager:
     
     def disconnect_machine(self, machine_name: str):
         """断开指定机器连接"""
-        with self._connection_lock:
-            if machine_name in self._connections:
-                self._connections[machine_name].disconnect()
-                logger.info(f"机器 {machine_name} 连接已断开")
-    
+        with self._connection_lock.read():
+            connection = self._connections.get(machine_name)
+        if connection is not None:
+            connection.disconnect()
+            logger.info(f"机器 {machine_name} 连接已断开")
+
     def disconnect_all(self):
         """断开所有机器连接"""
-        with self._connection_lock:
-            for connection in self._connections.values():
-                connection.disconnect()
-            logger.info("所有机器连接已断开")
+        with self._connection_lock.read():
+            connections = list(self._connections.values())
+        for connection in connections:
+            connection.disconnect()
+        logger.info("所有机器连接已断开")
     
     def refresh_connections(self):
         """刷新所有连接"""
@@ -205,9 +299,10 @@ class MachineManager:
         # 断开现有连接
         self.disconnect_all()
         
-        # 清空连接池
-        with self._connection_lock:
+        # 清空连接池和编号缓存
+        with self._connection_lock.write():
             self._connections.clear()
+        self._cabinet_id_cache = {}
         
         # 重新初始化
         self._initialize_connections()
@@ -215,23 +310,23 @@ class MachineManager:
         logger.info("机器连接刷新完成")
     
     def _cleanup_idle_connections(self):
-        """清理空闲连接"""
+        """清理空闲连接（由回收线程按_cleanup_interval周期调用）"""
         current_time = time.time()
-        if current_time - self._last_cleanup < self._cleanup_interval:
-            return
-        
-        with self._connection_lock:
-            idle_machines = []
-            for machine_name, connection in self._connections.items():
+
+        # 读锁下扫描；断开走连接对象自身的锁，不需要全局写锁
+        with self._connection_lock.read():
+            idle = [
+                (machine_name, connection)
+                for machine_name, connection in self._connections.items()
                 # 超过10分钟未使用的连接视为空闲
-                if current_time - connection.last_used > 600:
-                    idle_machines.append(machine_name)
-            
-            for machine_name in idle_machines:
-                self._connections[machine_name].disconnect()
-                logger.info(f"清理空闲连接: {machine_name}")
-            
-            self._last_cleanup = current_time
+                if current_time - connection.last_used > 600
+            ]
+
+        for machine_name, connection in idle:
+            connection.disconnect()
+            logger.info(f"清理空闲连接: {machine_name}")
+
+        self._last_cleanup = current_time
     
     def get_machine_list(self) -> list:
         """获取所有可用机器列表"""
@@ -246,45 +341,130 @@ class MachineManager:
             'connection_stats': None
         }
         
-        with self._connection_lock:
-            if machine_name in self._connections:
-                status['connection_stats'] = self._connections[machine_name].get_stats()
-        
+        with self._connection_lock.read():
+            connection = self._connections.get(machine_name)
+        if connection is not None:
+            status['connection_stats'] = connection.get_stats()
+
         return status
     
     def get_all_machine_status(self) -> Dict[str, Dict[str, Any]]:
-        """获取所有机器状态"""
-        all_status = {}
+        """获取所有机器状态
+
+        纯内存聚合：connected等字段来自连接对象自身的统计，
+        不对PLC发任何报文。需要实测链路时走test_machine_connection，
+        其探测经check_connection的TTL缓存，稳态下每台机器每个
+        检查周期至多一笔PDU。
+
+        连接表在读锁下一次快照，N台机器只取一次锁；可用性/状态
+        查询打在config_manager刷新时预建的映射上，均为O(1)。
+        """
         machine_list = self.get_machine_list()
-        
+
+        with self._connection_lock.read():
+            connections = dict(self._connections)
+
+        all_status = {}
         for machine_name in machine_list:
-            all_status[machine_name] = self.get_machine_status(machine_name)
-        
+            status = {
+                'machine_name': machine_name,
+                'available': config_manager.is_machine_available(machine_name),
+                'config_status': config_manager.get_machine_status(machine_name),
+                'connection_stats': None
+            }
+            connection = connections.get(machine_name)
+            if connection is not None:
+                status['connection_stats'] = connection.get_stats()
+            all_status[machine_name] = status
+
         return all_status
     
+    async def get_all_status(self) -> Dict[str, Dict[str, Any]]:
+        """并发获取所有机器状态（供异步接口调用）"""
+        machine_list = self.get_machine_list()
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.get_machine_status, name) for name in machine_list),
+            return_exceptions=True
+        )
+
+        all_status = {}
+        for machine_name, result in zip(machine_list, results):
+            if isinstance(result, Exception):
+                logger.error(f"获取机器 {machine_name} 状态异常: {result}")
+                all_status[machine_name] = {
+                    'machine_name': machine_name,
+                    'available': False,
+                    'error': str(result)
+                }
+            else:
+                all_status[machine_name] = result
+
+        return all_status
+
+    async def health_check_all(self) -> Dict[str, Dict[str, Any]]:
+        """并发对所有机器进行健康检查
+
+        每台机器的连接测试在独立线程中执行，总耗时取决于最慢的
+        一台机器而不是所有机器之和，单台超时不会拖慢其余机器。
+        """
+        machine_list = self.get_machine_list()
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.test_machine_connection, name) for name in machine_list),
+            return_exceptions=True
+        )
+
+        health_results = {}
+        for machine_name, result in zip(machine_list, results):
+            if isinstance(result, Exception):
+                logger.error(f"机器 {machine_name} 健康检查异常: {result}")
+                health_results[machine_name] = {
+                    'machine_name': machine_name,
+                    'success': False,
+                    'message': f'健康检查异常: {result}',
+                    'error': str(result)
+                }
+            else:
+                health_results[machine_name] = result
+
+        return health_results
+
+    def _resolve_cabinet_id(self, machine_name: str) -> Optional[int]:
+        """机器编号到柜体ID的映射（缓存，refresh_connections时失效）
+
+        查不到的编号也缓存None，避免未入库机器的每次操作都打一次DB。
+        """
+        if machine_name in self._cabinet_id_cache:
+            return self._cabinet_id_cache[machine_name]
+
+        cabinet = DroneCabinetDAO.get_by_code(machine_name)
+        cabinet_id = cabinet.id if cabinet else None
+        self._cabinet_id_cache[machine_name] = cabinet_id
+        return cabinet_id
+
     def _log_operation(self, machine_name: str, operation_type: str, result: int, error_msg: str = None):
-        """记录操作日志"""
+        """记录操作日志（入队异步批量落库，不阻塞调用方）"""
         try:
             # 只为数据库中的机器记录日志
             if machine_name == 'default':
                 return
-            
-            # 获取机器ID
-            cabinet = DroneCabinetDAO.get_by_code(machine_name)
-            if not cabinet:
+
+            cabinet_id = self._resolve_cabinet_id(machine_name)
+            if cabinet_id is None:
                 return
-            
+
             log = DroneCabinetLog(
-                cabinet_id=cabinet.id,
+                cabinet_id=cabinet_id,
                 operation_type=operation_type,
                 operation_result=result,
                 error_message=error_msg,
                 operator='system',
                 remark=f"机器管理器操作: {operation_type}"
             )
-            
-            DroneCabinetLogDAO.create_log(log)
-            
+
+            # 日志写入走DAO的异步批量通道：入队即返回，
+            # 后台线程按批executemany落库
+            DroneCabinetLogDAO.log_async(log)
+
         except Exception as e:
             logger.error(f"记录操作日志失败: {e}")
     
@@ -303,9 +483,9 @@ class MachineManager:
         try:
             client = self.get_machine_client(machine_name)
             if client:
-                # 尝试读取一个寄存器来测试连接
-                test_result = client.read_holding_registers(0, 1)
-                if test_result:
+                # 连接持久复用，判活走check_connection：近期有过成功
+                # 流量时直接命中TTL缓存，不再每次测试都发一笔真实读
+                if client.check_connection():
                     result['success'] = True
                     result['message'] = '连接测试成功'
                 else:
@@ -331,26 +511,27 @@ class MachineManager:
     
     def get_connection(self, machine_name: str) -> Optional['MachineConnection']:
         """获取指定机器的连接对象"""
-        self._cleanup_idle_connections()
-        
-        with self._connection_lock:
-            # 如果连接不存在，尝试创建
-            if machine_name not in self._connections:
-                if not self._create_connection(machine_name):
-                    return None
-            
+        with self._connection_lock.read():
             connection = self._connections.get(machine_name)
-            if connection:
-                # 记录操作日志
-                self._log_operation(machine_name, "get_connection", 1 if connection else 0)
-            return connection
+
+        if connection is None:
+            with self._connection_lock.write():
+                connection = self._connections.get(machine_name)
+                if connection is None:
+                    if not self._create_connection(machine_name):
+                        return None
+                    connection = self._connections[machine_name]
+
+        # 记录操作日志
+        self._log_operation(machine_name, "get_connection", 1)
+        return connection
     
     def get_manager_stats(self) -> Dict[str, Any]:
         """获取管理器统计信息"""
-        with self._connection_lock:
+        with self._connection_lock.read():
             total_connections = len(self._connections)
             healthy_connections = sum(1 for conn in self._connections.values() if conn.is_healthy())
-            active_connections = sum(1 for conn in self._connections.values() 
+            active_connections = sum(1 for conn in self._connections.values()
                                    if conn.client and conn.client.is_connected())
         
         return {
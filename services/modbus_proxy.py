@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Modbus代理模块
+多进程部署时共享唯一一条PLC连接
+
+WEB_CONCURRENCY>1时每个uvicorn工作进程都会各开一条PLC TCP连接，
+而多数PLC在服务端把这些连接串行化处理。本模块在一个进程里持有
+唯一的ModbusClient，通过Unix域套接字对外提供读写服务；其他进程
+使用ProxyModbusClient接入，本机套接字往返仅微秒级，远小于PLC侧
+排队的代价。
+
+单进程部署（默认配置）不需要本模块。
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Optional
+
+from loguru import logger
+
+from modbus_client import ModbusClient, modbus_client
+from config import REGISTER_MAP
+
+# 默认套接字路径
+DEFAULT_SOCKET_PATH = '/tmp/drone-modbus.sock'
+
+
+class _ProxyRequestHandler(socketserver.StreamRequestHandler):
+    """代理请求处理器：按行收发JSON请求"""
+
+    def handle(self):
+        client = self.server.plc_client
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request['op']
+                if op == 'read':
+                    result = client.read_holding_register(
+                        request['address'], read_nocache=request.get('nocache', False))
+                elif op == 'read_block':
+                    result = client.read_holding_registers(request['address'], request['count'])
+                elif op == 'write':
+                    result = client.write_holding_register(request['address'], request['value'])
+                elif op == 'write_block':
+                    result = client.write_holding_registers(request['address'], request['values'])
+                else:
+                    result = None
+                response = {'ok': True, 'result': result}
+            except Exception as e:
+                logger.error(f"代理请求处理失败: {e}")
+                response = {'ok': False, 'result': None}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class ModbusProxyServer:
+    """Modbus代理服务端
+
+    持有唯一的PLC连接，在Unix域套接字上多路复用各进程的读写请求。
+    在主进程（或独立小进程）中调用start()后，其余工作进程用
+    ProxyModbusClient接入。
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, plc_client: ModbusClient = None):
+        self.socket_path = socket_path
+        self.plc_client = plc_client or modbus_client
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """启动代理服务（后台线程）"""
+        if self._server is not None:
+            return
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        if not self.plc_client.is_connected:
+            self.plc_client.connect()
+
+        self._server = socketserver.ThreadingUnixStreamServer(
+            self.socket_path, _ProxyRequestHandler
+        )
+        self._server.plc_client = self.plc_client
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='modbus-proxy', daemon=True)
+        self._thread.start()
+        logger.info(f"Modbus代理服务已启动: {self.socket_path}")
+
+    def stop(self):
+        """停止代理服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            logger.info("Modbus代理服务已停止")
+
+
+class ProxyModbusClient(ModbusClient):
+    """走代理的Modbus客户端
+
+    复用ModbusClient的全部按名/批量/握手辅助方法，只把四个底层
+    寄存器事务改为经Unix域套接字转发给代理进程。
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        super().__init__()
+        self.socket_path = socket_path
+        self._sock = None
+        self._sock_file = None
+
+    def connect(self) -> bool:
+        """连接到代理服务"""
+        try:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self.socket_path)
+            self._sock_file = self._sock.makefile('rwb')
+            self.is_connected = True
+            logger.info(f"已连接Modbus代理: {self.socket_path}")
+            return True
+        except OSError as e:
+            logger.error(f"连接Modbus代理失败: {e}")
+            return False
+
+    def disconnect(self):
+        """断开代理连接"""
+        if self._sock is not None:
+            try:
+                self._sock_file.close()
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+            self._sock_file = None
+            self.is_connected = False
+            logger.info("已断开Modbus代理连接")
+
+    def _request(self, payload: dict):
+        """发送一个代理请求并等待应答"""
+        if not self.is_connected:
+            logger.error("Modbus代理未连接")
+            return None
+        with self._io_lock:
+            try:
+                self._sock_file.write(json.dumps(payload).encode('utf-8') + b'\n')
+                self._sock_file.flush()
+                line = self._sock_file.readline()
+            except OSError as e:
+                logger.error(f"Modbus代理请求失败: {e}")
+                return None
+        if not line:
+            logger.error("Modbus代理连接已关闭")
+            return None
+        response = json.loads(line)
+        return response['result'] if response.get('ok') else None
+
+    def read_holding_register(self, address: int, read_nocache: bool = False) -> Optional[int]:
+        """读取保持寄存器（经代理）
+
+        read_nocache随请求转发：握手轮询需要新鲜值时，
+        代理端同样跳过其200ms读缓存。
+        """
+        return self._request({'op': 'read', 'address': address, 'nocache': read_nocache})
+
+    def read_holding_registers(self, address: int, count: int = 1, **kwargs) -> Optional[list]:
+        """读取多个保持寄存器（经代理）"""
+        return self._request({'op': 'read_block', 'address': address, 'count': count})
+
+    def write_holding_register(self, address: int, value: int) -> bool:
+        """写入保持寄存器（经代理）"""
+        return bool(self._request({'op': 'write', 'address': address, 'value': value}))
+
+    def write_holding_registers(self, address: int, values: list) -> bool:
+        """写入多个连续保持寄存器（经代理）"""
+        return bool(self._request({'op': 'write_block', 'address': address, 'values': values}))
+
+    def check_connection(self) -> bool:
+        """检查代理链路状态"""
+        if not self.is_connected:
+            return False
+        return self._request({'op': 'read', 'address': REGISTER_MAP['SYSTEM_STATUS']}) is not None
@@ -4,18 +4,99 @@
 实现对PLC设备状态、气象站数据、系统报警等的监控功能
 """
 
+import asyncio
 import time
+from collections import deque
+from itertools import islice
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 from loguru import logger
 from modbus_client import modbus_client
 from config import OPERATION_CODES, POSITION_CODES
 
+# 操作码在进程生命周期内不变，导入时绑定成常量，
+# 解析热路径不再每次做字典查找
+_SYSTEM_NORMAL = OPERATION_CODES.get('SYSTEM_NORMAL', 0)
+_SERVO_NORMAL = OPERATION_CODES.get('SERVO_NORMAL', 0)
+_LANDING_PAD_AVAILABLE = OPERATION_CODES.get('LANDING_PAD_AVAILABLE', 10)
+_STORAGE_AVAILABLE = OPERATION_CODES.get('STORAGE_AVAILABLE', 10)
+
+# 状态码描述表：构建一次，方法内只剩一次.get
+_SYSTEM_STATUS_MAP = {
+    0: "系统正常",
+    1: "系统初始化中",
+    2: "系统维护模式",
+    3: "系统故障",
+    4: "系统离线"
+}
+_LANDING_PAD_STATUS_MAP = {
+    _LANDING_PAD_AVAILABLE: "停机坪可用",
+    OPERATION_CODES.get('LANDING_PAD_OCCUPIED', 20): "停机坪被占用",
+    30: "停机坪维护中",
+    40: "停机坪故障"
+}
+_SERVO_STATUS_MAP = {
+    0: "舵机正常",
+    1: "舵机运行中",
+    2: "舵机故障",
+    3: "舵机离线",
+    4: "舵机过载"
+}
+_STORAGE_STATUS_MAP = {
+    _STORAGE_AVAILABLE: "有空位可用",
+    OPERATION_CODES.get('STORAGE_FULL', 20): "存储已满",
+    30: "存储系统维护中",
+    40: "存储系统故障"
+}
+_SEND_STORAGE_STATUS_MAP = {
+    10: "有空寄件箱可寄件",  # 0x0A
+    11: "无空寄件箱不可寄件",  # 0x0B
+    30: "寄件系统维护中",
+    40: "寄件系统故障"
+}
+
+def _tail(history: deque, limit: int) -> list:
+    """取历史缓冲最新的limit条（deque不支持切片，用islice定位）"""
+    return list(islice(history, max(0, len(history) - limit), None))
+
+
+# 报警位定义
+_ALARM_BITS = (
+    (0x01, "舱门故障"),
+    (0x02, "舵机故障"),
+    (0x04, "停机坪异常"),
+    (0x08, "气象站故障"),
+    (0x10, "存储系统异常"),
+    (0x20, "通信异常"),
+    (0x40, "电源异常"),
+    (0x80, "安全系统报警"),
+)
+
+# 报警字只有一个字节，256种组合在导入时全部展开成查找表，
+# 解析退化为一次下标取值
+_ALARM_LUT = tuple(
+    tuple(name for bit, name in _ALARM_BITS if code & bit) or ("无报警",)
+    for code in range(256)
+)
+
 
 class SystemMonitor:
     """系统状态监控器类"""
-    
-    def __init__(self):
+
+    # 分组读：组内地址彼此邻近，read_registers_by_names一次FC3
+    # 事务就能覆盖整组，N个寄存器只付一次往返
+    _WEATHER_REGISTERS = (
+        'WEATHER_WIND_SPEED', 'WEATHER_WIND_DIRECTION', 'WEATHER_TEMPERATURE',
+        'WEATHER_HUMIDITY', 'WEATHER_PRESSURE', 'WEATHER_RAINFALL',
+    )
+    _STORAGE_REGISTERS = (
+        'STORAGE_STATUS', 'PICKUP_STORAGE_STATUS', 'SEND_STORAGE_STATUS',
+    )
+    _STATUS_GROUP_REGISTERS = (
+        'SYSTEM_STATUS', 'SYSTEM_ALARM', 'LANDING_PAD_STATUS', 'SERVO_STATUS',
+    ) + _STORAGE_REGISTERS
+
+    def __init__(self, max_history: int = 1000):
         # 系统状态寄存器
         self.system_status_register = 'SYSTEM_STATUS'
         self.system_alarm_register = 'SYSTEM_ALARM'
@@ -39,19 +120,21 @@ class SystemMonitor:
         self.pickup_storage_status_register = 'PICKUP_STORAGE_STATUS'
         self.send_storage_status_register = 'SEND_STORAGE_STATUS'
         
-        # 监控历史数据
-        self.status_history = []
-        self.alarm_history = []
-        self.weather_history = []
+        # 监控历史数据：maxlen定长环形缓冲，追加O(1)自动挤掉最旧项
+        self.max_history = max_history
+        self.status_history = deque(maxlen=max_history)
+        self.alarm_history = deque(maxlen=max_history)
+        self.weather_history = deque(maxlen=max_history)
         
-    def get_system_status(self) -> Optional[Dict[str, Any]]:
+    def get_system_status(self, raw: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """获取系统状态
         
         Returns:
             Dict: 系统状态信息，None表示获取失败
         """
         try:
-            system_status = modbus_client.read_register_by_name(self.system_status_register)
+            system_status = raw if raw is not None else \
+                modbus_client.read_register_by_name(self.system_status_register)
             
             if system_status is None:
                 return None
@@ -60,7 +143,7 @@ class SystemMonitor:
                 'timestamp': datetime.now().isoformat(),
                 'raw_status': system_status,
                 'status_description': self._parse_system_status(system_status),
-                'is_normal': system_status == OPERATION_CODES.get('SYSTEM_NORMAL', 0)
+                'is_normal': system_status == _SYSTEM_NORMAL
             }
             
             return status_info
@@ -69,14 +152,15 @@ class SystemMonitor:
             logger.error(f"获取系统状态异常: {e}")
             return None
     
-    def get_system_alarms(self) -> Optional[Dict[str, Any]]:
+    def get_system_alarms(self, raw: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """获取系统报警信息
         
         Returns:
             Dict: 系统报警信息，None表示获取失败
         """
         try:
-            alarm_status = modbus_client.read_register_by_name(self.system_alarm_register)
+            alarm_status = raw if raw is not None else \
+                modbus_client.read_register_by_name(self.system_alarm_register)
             
             if alarm_status is None:
                 return None
@@ -94,14 +178,15 @@ class SystemMonitor:
             logger.error(f"获取系统报警异常: {e}")
             return None
     
-    def get_landing_pad_status(self) -> Optional[Dict[str, Any]]:
+    def get_landing_pad_status(self, raw: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """获取停机坪状态
         
         Returns:
             Dict: 停机坪状态信息，None表示获取失败
         """
         try:
-            pad_status = modbus_client.read_register_by_name(self.landing_pad_status_register)
+            pad_status = raw if raw is not None else \
+                modbus_client.read_register_by_name(self.landing_pad_status_register)
             
             if pad_status is None:
                 return None
@@ -110,7 +195,7 @@ class SystemMonitor:
                 'timestamp': datetime.now().isoformat(),
                 'raw_status': pad_status,
                 'status_description': self._parse_landing_pad_status(pad_status),
-                'is_available': pad_status == OPERATION_CODES.get('LANDING_PAD_AVAILABLE', 10)
+                'is_available': pad_status == _LANDING_PAD_AVAILABLE
             }
             
             return status_info
@@ -119,14 +204,15 @@ class SystemMonitor:
             logger.error(f"获取停机坪状态异常: {e}")
             return None
     
-    def get_servo_status(self) -> Optional[Dict[str, Any]]:
+    def get_servo_status(self, raw: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """获取舵机状态
         
         Returns:
             Dict: 舵机状态信息，None表示获取失败
         """
         try:
-            servo_status = modbus_client.read_register_by_name(self.servo_status_register)
+            servo_status = raw if raw is not None else \
+                modbus_client.read_register_by_name(self.servo_status_register)
             
             if servo_status is None:
                 return None
@@ -135,7 +221,7 @@ class SystemMonitor:
                 'timestamp': datetime.now().isoformat(),
                 'raw_status': servo_status,
                 'status_description': self._parse_servo_status(servo_status),
-                'is_normal': servo_status == OPERATION_CODES.get('SERVO_NORMAL', 0)
+                'is_normal': servo_status == _SERVO_NORMAL
             }
             
             return status_info
@@ -144,13 +230,21 @@ class SystemMonitor:
             logger.error(f"获取舵机状态异常: {e}")
             return None
     
-    def get_weather_data(self) -> Optional[Dict[str, Any]]:
+    def get_weather_data(self, values: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
         """获取气象站数据
-        
+
+        六个气象寄存器地址相邻，一次分组读代替六次单独往返。
+
+        Args:
+            values: 预读的{寄存器名: 值}，不传则现场分组读取
+
         Returns:
             Dict: 气象数据，None表示获取失败
         """
         try:
+            if values is None:
+                values = modbus_client.read_registers_by_names(list(self._WEATHER_REGISTERS)) or {}
+
             weather_data = {
                 'timestamp': datetime.now().isoformat(),
                 'wind_speed': None,
@@ -160,77 +254,85 @@ class SystemMonitor:
                 'pressure': None,
                 'rainfall': None
             }
-            
-            # 读取风速（m/s）
-            wind_speed = modbus_client.read_register_by_name(self.weather_wind_speed_register)
+
+            # 风速（0.1m/s为单位）
+            wind_speed = values.get('WEATHER_WIND_SPEED')
             if wind_speed is not None:
-                weather_data['wind_speed'] = float(wind_speed) / 10.0  # 假设以0.1m/s为单位
-            
-            # 读取风向（度）
-            wind_direction = modbus_client.read_register_by_name(self.weather_wind_direction_register)
+                weather_data['wind_speed'] = float(wind_speed) / 10.0
+
+            # 风向（度）
+            wind_direction = values.get('WEATHER_WIND_DIRECTION')
             if wind_direction is not None:
                 weather_data['wind_direction'] = float(wind_direction)
-            
-            # 读取温度（℃）
-            temperature = modbus_client.read_register_by_name(self.weather_temperature_register)
+
+            # 温度（0.1℃为单位）
+            temperature = values.get('WEATHER_TEMPERATURE')
             if temperature is not None:
-                weather_data['temperature'] = float(temperature) / 10.0  # 假设以0.1℃为单位
-            
-            # 读取湿度（%）
-            humidity = modbus_client.read_register_by_name(self.weather_humidity_register)
+                weather_data['temperature'] = float(temperature) / 10.0
+
+            # 湿度（0.1%为单位）
+            humidity = values.get('WEATHER_HUMIDITY')
             if humidity is not None:
-                weather_data['humidity'] = float(humidity) / 10.0  # 假设以0.1%为单位
-            
-            # 读取气压（hPa）
-            pressure = modbus_client.read_register_by_name(self.weather_pressure_register)
+                weather_data['humidity'] = float(humidity) / 10.0
+
+            # 气压（0.1hPa为单位）
+            pressure = values.get('WEATHER_PRESSURE')
             if pressure is not None:
-                weather_data['pressure'] = float(pressure) / 10.0  # 假设以0.1hPa为单位
-            
-            # 读取降雨量（mm）
-            rainfall = modbus_client.read_register_by_name(self.weather_rainfall_register)
+                weather_data['pressure'] = float(pressure) / 10.0
+
+            # 降雨量（0.1mm为单位）
+            rainfall = values.get('WEATHER_RAINFALL')
             if rainfall is not None:
-                weather_data['rainfall'] = float(rainfall) / 10.0  # 假设以0.1mm为单位
-            
+                weather_data['rainfall'] = float(rainfall) / 10.0
+
             return weather_data
-            
+
         except Exception as e:
             logger.error(f"获取气象数据异常: {e}")
             return None
     
-    def get_storage_capacity(self) -> Optional[Dict[str, Any]]:
+    def get_storage_capacity(self, values: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
         """获取存储容量状态
-        
+
+        三个存储状态寄存器一次分组读取。
+
+        Args:
+            values: 预读的{寄存器名: 值}，不传则现场分组读取
+
         Returns:
             Dict: 存储容量信息，None表示获取失败
         """
         try:
+            if values is None:
+                values = modbus_client.read_registers_by_names(list(self._STORAGE_REGISTERS)) or {}
+
             capacity_info = {
                 'timestamp': datetime.now().isoformat(),
                 'general_storage': None,
                 'pickup_storage': None,
                 'send_storage': None
             }
-            
-            # 读取一般存储状态
-            general_status = modbus_client.read_register_by_name(self.storage_status_register)
+
+            # 一般存储状态
+            general_status = values.get('STORAGE_STATUS')
             if general_status is not None:
                 capacity_info['general_storage'] = {
                     'raw_status': general_status,
                     'description': self._parse_storage_status(general_status),
-                    'is_available': general_status == OPERATION_CODES.get('STORAGE_AVAILABLE', 10)
+                    'is_available': general_status == _STORAGE_AVAILABLE
                 }
             
-            # 读取取件存储状态
-            pickup_status = modbus_client.read_register_by_name(self.pickup_storage_status_register)
+            # 取件存储状态
+            pickup_status = values.get('PICKUP_STORAGE_STATUS')
             if pickup_status is not None:
                 capacity_info['pickup_storage'] = {
                     'raw_status': pickup_status,
                     'description': self._parse_storage_status(pickup_status),
-                    'is_available': pickup_status == OPERATION_CODES.get('STORAGE_AVAILABLE', 10)
+                    'is_available': pickup_status == _STORAGE_AVAILABLE
                 }
             
-            # 读取寄件存储状态
-            send_status = modbus_client.read_register_by_name(self.send_storage_status_register)
+            # 寄件存储状态
+            send_status = values.get('SEND_STORAGE_STATUS')
             if send_status is not None:
                 capacity_info['send_storage'] = {
                     'raw_status': send_status,
@@ -246,21 +348,29 @@ class SystemMonitor:
     
     def get_comprehensive_status(self) -> Dict[str, Any]:
         """获取综合系统状态
-        
+
+        状态/告警/舵机/存储一组、气象一组，各发一次分组读，
+        整轮采集从十余次Modbus往返降到两次。
+
         Returns:
             Dict: 综合状态信息
         """
+        status_values = modbus_client.read_registers_by_names(
+            list(self._STATUS_GROUP_REGISTERS)) or {}
+        weather_values = modbus_client.read_registers_by_names(
+            list(self._WEATHER_REGISTERS)) or {}
+
         comprehensive_status = {
             'timestamp': datetime.now().isoformat(),
-            'system_status': self.get_system_status(),
-            'system_alarms': self.get_system_alarms(),
-            'landing_pad_status': self.get_landing_pad_status(),
-            'servo_status': self.get_servo_status(),
-            'weather_data': self.get_weather_data(),
-            'storage_capacity': self.get_storage_capacity(),
+            'system_status': self.get_system_status(status_values.get('SYSTEM_STATUS')),
+            'system_alarms': self.get_system_alarms(status_values.get('SYSTEM_ALARM')),
+            'landing_pad_status': self.get_landing_pad_status(status_values.get('LANDING_PAD_STATUS')),
+            'servo_status': self.get_servo_status(status_values.get('SERVO_STATUS')),
+            'weather_data': self.get_weather_data(weather_values),
+            'storage_capacity': self.get_storage_capacity(status_values),
             'plc_connection': modbus_client.is_connected
         }
-        
+
         return comprehensive_status
     
     def start_monitoring(self, interval: int = 30, max_history: int = 1000) -> None:
@@ -271,118 +381,93 @@ class SystemMonitor:
             max_history: 最大历史记录数
         """
         logger.info(f"开始系统监控，间隔: {interval}秒")
-        
+        self._set_max_history(max_history)
+
         try:
             while True:
-                # 获取综合状态
-                status = self.get_comprehensive_status()
-                
-                # 记录状态历史
-                self.status_history.append(status)
-                if len(self.status_history) > max_history:
-                    self.status_history.pop(0)
-                
-                # 检查报警
-                if status['system_alarms'] and status['system_alarms']['has_alarm']:
-                    self.alarm_history.append(status['system_alarms'])
-                    if len(self.alarm_history) > max_history:
-                        self.alarm_history.pop(0)
-                    
-                    logger.warning(f"系统报警: {status['system_alarms']['alarm_list']}")
-                
-                # 记录气象数据历史
-                if status['weather_data']:
-                    self.weather_history.append(status['weather_data'])
-                    if len(self.weather_history) > max_history:
-                        self.weather_history.pop(0)
-                
-                # 检查PLC连接状态
-                if not status['plc_connection']:
-                    logger.error("PLC连接断开，尝试重新连接...")
-                    modbus_client.reconnect()
-                
+                self._monitor_tick()
                 time.sleep(interval)
                 
         except KeyboardInterrupt:
             logger.info("监控已停止")
         except Exception as e:
             logger.error(f"监控异常: {e}")
+
+    async def start_monitoring_async(self, interval: int = 30, max_history: int = 1000) -> None:
+        """开始系统监控（异步版）
+
+        采集本身是阻塞的Modbus读，放到线程池执行；间隔等待用
+        asyncio.sleep，可与Web服务共用同一个事件循环，不再占一个
+        专门的监控线程。
+        """
+        logger.info(f"开始系统监控（异步），间隔: {interval}秒")
+        self._set_max_history(max_history)
+
+        try:
+            while True:
+                await asyncio.to_thread(self._monitor_tick)
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            logger.info("监控已停止")
+            raise
+        except Exception as e:
+            logger.error(f"监控异常: {e}")
+
+    def _set_max_history(self, max_history: int) -> None:
+        """调整历史缓冲上限（保留已有记录的最新部分）"""
+        if max_history == self.max_history:
+            return
+        self.max_history = max_history
+        self.status_history = deque(self.status_history, maxlen=max_history)
+        self.alarm_history = deque(self.alarm_history, maxlen=max_history)
+        self.weather_history = deque(self.weather_history, maxlen=max_history)
+
+    def _monitor_tick(self) -> None:
+        """执行一轮监控采集"""
+        # 获取综合状态
+        status = self.get_comprehensive_status()
+
+        # 记录状态历史（deque到上限自动挤掉最旧项）
+        self.status_history.append(status)
+
+        # 检查报警
+        if status['system_alarms'] and status['system_alarms']['has_alarm']:
+            self.alarm_history.append(status['system_alarms'])
+
+            logger.warning(f"系统报警: {status['system_alarms']['alarm_list']}")
+
+        # 记录气象数据历史
+        if status['weather_data']:
+            self.weather_history.append(status['weather_data'])
+
+        # 检查PLC连接状态
+        if not status['plc_connection']:
+            logger.error("PLC连接断开，尝试重新连接...")
+            modbus_client.reconnect()
     
     def _parse_system_status(self, status_code: int) -> str:
         """解析系统状态码"""
-        status_map = {
-            0: "系统正常",
-            1: "系统初始化中",
-            2: "系统维护模式",
-            3: "系统故障",
-            4: "系统离线"
-        }
-        return status_map.get(status_code, f"未知状态: {status_code}")
-    
+        return _SYSTEM_STATUS_MAP.get(status_code, f"未知状态: {status_code}")
+
     def _parse_system_alarms(self, alarm_code: int) -> List[str]:
-        """解析系统报警码"""
-        alarms = []
-        
-        # 使用位操作解析报警
-        if alarm_code & 0x01:
-            alarms.append("舱门故障")
-        if alarm_code & 0x02:
-            alarms.append("舵机故障")
-        if alarm_code & 0x04:
-            alarms.append("停机坪异常")
-        if alarm_code & 0x08:
-            alarms.append("气象站故障")
-        if alarm_code & 0x10:
-            alarms.append("存储系统异常")
-        if alarm_code & 0x20:
-            alarms.append("通信异常")
-        if alarm_code & 0x40:
-            alarms.append("电源异常")
-        if alarm_code & 0x80:
-            alarms.append("安全系统报警")
-        
-        return alarms if alarms else ["无报警"]
-    
+        """解析系统报警码（256项查找表直取）"""
+        return list(_ALARM_LUT[alarm_code & 0xFF])
+
     def _parse_landing_pad_status(self, status_code: int) -> str:
         """解析停机坪状态码"""
-        status_map = {
-            OPERATION_CODES.get('LANDING_PAD_AVAILABLE', 10): "停机坪可用",
-            OPERATION_CODES.get('LANDING_PAD_OCCUPIED', 20): "停机坪被占用",
-            30: "停机坪维护中",
-            40: "停机坪故障"
-        }
-        return status_map.get(status_code, f"未知状态: {status_code}")
-    
+        return _LANDING_PAD_STATUS_MAP.get(status_code, f"未知状态: {status_code}")
+
     def _parse_servo_status(self, status_code: int) -> str:
         """解析舵机状态码"""
-        status_map = {
-            0: "舵机正常",
-            1: "舵机运行中",
-            2: "舵机故障",
-            3: "舵机离线",
-            4: "舵机过载"
-        }
-        return status_map.get(status_code, f"未知状态: {status_code}")
-    
+        return _SERVO_STATUS_MAP.get(status_code, f"未知状态: {status_code}")
+
     def _parse_storage_status(self, status_code: int) -> str:
         """解析存储状态码"""
-        status_map = {
-            OPERATION_CODES.get('STORAGE_AVAILABLE', 10): "有空位可用",
-            OPERATION_CODES.get('STORAGE_FULL', 20): "存储已满",
-            30: "存储系统维护中",
-            40: "存储系统故障"
-        }
-        return status_map.get(status_code, f"未知状态: {status_code}")
-    
+        return _STORAGE_STATUS_MAP.get(status_code, f"未知状态: {status_code}")
+
     def _parse_send_storage_status(self, status_code: int) -> str:
         """解析寄件存储状态码"""
-        status_map = {
-            10: "有空寄件箱可寄件",  # 0x0A
-            11: "无空寄件箱不可寄件",  # 0x0B
-            30: "寄件系统维护中",
-            40: "寄件系统故障"
-        }
-        return status_map.get(status_code, f"未知寄件状态: {status_code}")
+        return _SEND_STORAGE_STATUS_MAP.get(status_code, f"未知寄件状态: {status_code}")
     
     def get_status_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """获取状态历史记录
@@ -393,7 +478,7 @@ class SystemMonitor:
         Returns:
             List: 状态历史记录
         """
-        return self.status_history[-limit:] if self.status_history else []
+        return _tail(self.status_history, limit)
     
     def get_alarm_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """获取报警历史记录
@@ -404,7 +489,7 @@ class SystemMonitor:
         Returns:
             List: 报警历史记录
         """
-        return self.alarm_history[-limit:] if self.alarm_history else []
+        return _tail(self.alarm_history, limit)
     
     def get_weather_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """获取气象数据历史记录
@@ -415,7 +500,7 @@ class SystemMonitor:
         Returns:
             List: 气象数据历史记录
         """
-        return self.weather_history[-limit:] if self.weather_history else []
+        return _tail(self.weather_history, limit)
     
     def check_weather_conditions(self) -> Dict[str, Any]:
         """检查气象条件是否适合无人机操作
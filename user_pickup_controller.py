@@ -8,8 +8,15 @@ import time
 from typing import Optional, Tuple
 from loguru import logger
 from base_controller import BaseController
+from modbus_client import modbus_client
 from config import OPERATION_CODES, POSITION_CODES
 
+# 操作码模块常量：加载时绑定一次，轮询循环里不再重复查表
+_USER_PICKUP = OPERATION_CODES['USER_PICKUP']
+_USER_PICKUP_COMPLETE = OPERATION_CODES['USER_PICKUP_COMPLETE']
+_USER_RECYCLE = OPERATION_CODES['USER_RECYCLE']
+_USER_RECYCLE_COMPLETE = OPERATION_CODES['USER_RECYCLE_COMPLETE']
+
 
 class UserPickupController(BaseController):
     """用户取件控制器类"""
@@ -50,7 +57,7 @@ class UserPickupController(BaseController):
             while time.time() - start_time < timeout:
                 pickup_status = modbus_client.read_register_by_name(self.pickup_op_register)
                 
-                if pickup_status == OPERATION_CODES['USER_PICKUP']:
+                if pickup_status == _USER_PICKUP:
                     logger.info("用户正在取件")
                     break
                     
@@ -70,7 +77,7 @@ class UserPickupController(BaseController):
             # 3. 等待取件完成
             if modbus_client.wait_for_register_value(
                 self.pickup_op_register,
-                OPERATION_CODES['USER_PICKUP_COMPLETE'],
+                _USER_PICKUP_COMPLETE,
                 120  # 给用户足够时间取件
             ):
                 logger.info("用户取件完成")
@@ -129,7 +136,7 @@ class UserPickupController(BaseController):
             while time.time() - start_time < timeout:
                 recycle_status = modbus_client.read_register_by_name(self.recycle_op_register)
                 
-                if recycle_status == OPERATION_CODES['USER_RECYCLE']:
+                if recycle_status == _USER_RECYCLE:
                     logger.info("用户已点击回收按钮，机柜门正在打开")
                     break
                     
@@ -141,7 +148,7 @@ class UserPickupController(BaseController):
             # 2. 等待机柜门打开完成
             if modbus_client.wait_for_register_value(
                 self.recycle_op_register,
-                OPERATION_CODES['USER_RECYCLE_COMPLETE'],
+                _USER_RECYCLE_COMPLETE,
                 30
             ):
                 logger.info("机柜门已打开，等待用户放入空箱")
@@ -157,7 +164,7 @@ class UserPickupController(BaseController):
             while time.time() - start_time < timeout:
                 confirm_status = modbus_client.read_register_by_name(self.confirm_recycle_register)
                 
-                if confirm_status == OPERATION_CODES['USER_RECYCLE']:
+                if confirm_status == _USER_RECYCLE:
                     logger.info("用户正在存放空箱")
                     break
                     
@@ -169,7 +176,7 @@ class UserPickupController(BaseController):
             # 4. 等待回收完成
             if modbus_client.wait_for_register_value(
                 self.confirm_recycle_register,
-                OPERATION_CODES['USER_RECYCLE_COMPLETE'],
+                _USER_RECYCLE_COMPLETE,
                 60
             ):
                 logger.info("空箱回收完成")
@@ -226,15 +233,15 @@ class UserPickupController(BaseController):
             recycle_status = modbus_client.read_register_by_name(self.recycle_op_register)
             confirm_status = modbus_client.read_register_by_name(self.confirm_recycle_register)
             
-            if pickup_status == OPERATION_CODES['USER_PICKUP']:
+            if pickup_status == _USER_PICKUP:
                 return "用户正在取件"
-            elif pickup_status == OPERATION_CODES['USER_PICKUP_COMPLETE']:
-                if recycle_status == OPERATION_CODES['USER_RECYCLE']:
+            elif pickup_status == _USER_PICKUP_COMPLETE:
+                if recycle_status == _USER_RECYCLE:
                     return "取件完成，等待回收空箱"
-                elif recycle_status == OPERATION_CODES['USER_RECYCLE_COMPLETE']:
-                    if confirm_status == OPERATION_CODES['USER_RECYCLE']:
+                elif recycle_status == _USER_RECYCLE_COMPLETE:
+                    if confirm_status == _USER_RECYCLE:
                         return "正在存放空箱"
-                    elif confirm_status == OPERATION_CODES['USER_RECYCLE_COMPLETE']:
+                    elif confirm_status == _USER_RECYCLE_COMPLETE:
                         return "取件和回收流程全部完成"
                     else:
                         return "机柜门已打开，等待放入空箱"
@@ -8,8 +8,22 @@ import time
 from typing import Optional, Tuple
 from loguru import logger
 from base_controller import BaseController
+from modbus_client import modbus_client
 from config import OPERATION_CODES, POSITION_CODES
 
+# 操作码模块常量：加载时绑定一次，轮询循环里不再重复查表
+_USER_SEND_EMPTY_BOX = OPERATION_CODES['USER_SEND_EMPTY_BOX']
+_USER_SEND_COMPLETE = OPERATION_CODES['USER_SEND_COMPLETE']
+_USER_SEND_BOX_OPEN = OPERATION_CODES['USER_SEND_BOX_OPEN']
+
+# 寄件操作状态→描述表（模块级构建一次）
+_SEND_STATUS_MAP = {
+    0: "等待寄件操作",
+    _USER_SEND_EMPTY_BOX: "正在取空箱/存寄件箱",
+    _USER_SEND_COMPLETE: "操作完成",
+    _USER_SEND_BOX_OPEN: "寄件箱门已打开，等待放入物品",
+}
+
 
 class UserSendController(BaseController):
     """用户寄件控制器类"""
@@ -113,7 +127,7 @@ class UserSendController(BaseController):
             while time.time() - start_time < timeout:
                 send_status = modbus_client.read_register_by_name(self.send_op_register)
                 
-                if send_status == OPERATION_CODES['USER_SEND_EMPTY_BOX']:
+                if send_status == _USER_SEND_EMPTY_BOX:
                     logger.info("用户正在取空箱")
                     break
                     
@@ -133,7 +147,7 @@ class UserSendController(BaseController):
             # 3. 等待取空箱完成
             if modbus_client.wait_for_register_value(
                 self.send_op_register,
-                OPERATION_CODES['USER_SEND_COMPLETE'],
+                _USER_SEND_COMPLETE,
                 timeout
             ):
                 logger.info("用户取空箱完成")
@@ -166,7 +180,7 @@ class UserSendController(BaseController):
             while time.time() - start_time < timeout:
                 send_status = modbus_client.read_register_by_name(self.send_op_register)
                 
-                if send_status == OPERATION_CODES['USER_SEND_BOX_OPEN']:
+                if send_status == _USER_SEND_BOX_OPEN:
                     logger.info("寄件箱门已打开，等待用户放入物品")
                     break
                     
@@ -183,7 +197,7 @@ class UserSendController(BaseController):
             while time.time() - start_time < timeout:
                 send_status = modbus_client.read_register_by_name(self.send_op_register)
                 
-                if send_status == OPERATION_CODES['USER_SEND_EMPTY_BOX']:
+                if send_status == _USER_SEND_EMPTY_BOX:
                     logger.info("用户正在存寄件箱")
                     break
                     
@@ -195,7 +209,7 @@ class UserSendController(BaseController):
             # 3. 等待存寄件箱完成
             if modbus_client.wait_for_register_value(
                 self.send_op_register,
-                OPERATION_CODES['USER_SEND_COMPLETE'],
+                _USER_SEND_COMPLETE,
                 60
             ):
                 logger.info("用户存寄件箱完成")
@@ -351,14 +365,7 @@ class UserSendController(BaseController):
             if send_status is None:
                 return None
             
-            status_map = {
-                0: "等待寄件操作",
-                OPERATION_CODES['USER_SEND_EMPTY_BOX']: "正在取空箱/存寄件箱",
-                OPERATION_CODES['USER_SEND_COMPLETE']: "操作完成",
-                OPERATION_CODES['USER_SEND_BOX_OPEN']: "寄件箱门已打开，等待放入物品"
-            }
-            
-            return status_map.get(send_status, f"未知状态: {send_status}")
+            return _SEND_STATUS_MAP.get(send_status, f"未知状态: {send_status}")
             
         except Exception as e:
             logger.error(f"获取寄件状态异常: {e}")
@@ -9,52 +9,73 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request, Dep
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
+import hashlib
+import hmac
+import os
+import time
 import uvicorn
 from datetime import datetime
 from loguru import logger
-from config import SECURITY_CONFIG
+from config import LOG_CONFIG, SECURITY_CONFIG
 
-# 全局变量存储有效的安全key - 从配置文件加载
-valid_keys = SECURITY_CONFIG['valid_keys'].copy()
+# 启动时将有效key预哈希为只读集合：校验走恒定时间比较，内存中不保留明文key
+_VALID_KEY_HASHES = frozenset(
+    hashlib.blake2b(k.encode('utf-8'), digest_size=16).digest()
+    for k in SECURITY_CONFIG['valid_keys']
+)
+
+def is_valid_key(key: Optional[str]) -> bool:
+    """校验安全key（哈希后恒定时间比较，避免计时侧信道）"""
+    if not key:
+        return False
+    key_hash = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    return any(hmac.compare_digest(key_hash, h) for h in _VALID_KEY_HASHES)
 
 # 安全校验中间件
+# 401错误页内容首次使用时读取并缓存，之后的拒绝响应不再碰磁盘
+_key_error_html = None
+
+
+def _load_key_error_html() -> str:
+    global _key_error_html
+    if _key_error_html is None:
+        try:
+            with open('templates/key_error.html', 'r', encoding='utf-8') as f:
+                _key_error_html = f.read()
+        except FileNotFoundError:
+            _key_error_html = "<h1>安全验证失败</h1><p>key丢失或无效，请通过正确的链接重新访问</p>"
+    return _key_error_html
+
+
 class SecurityMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         # 跳过静态文件和设置key的请求
+        # 只看path，不做str(request.url)的整串拼接
+        path = request.url.path
         if (
-            request.url.path.startswith("/static/") or 
-            request.url.path == "/" or
-            "/key=" in str(request.url) or
-            request.url.path == "/api/health"
+            path.startswith("/static/") or
+            path == "/" or
+            "/key=" in path or
+            path == "/api/health"
         ):
             response = await call_next(request)
             return response
         
         # 检查key参数
         key = request.query_params.get("key")
-        if not key or key not in valid_keys:
+        if not is_valid_key(key):
             # 如果是API请求，返回JSON错误
-            if request.url.path.startswith('/api/'):
-                return JSONResponse(
+            if path.startswith('/api/'):
+                return ORJSONResponse(
                     status_code=401,
                     content={"success": False, "message": "安全校验失败：key丢失或无效，请通过正确的链接重新访问"}
                 )
             # 如果是页面请求，返回错误页面
-            else:
-                from fastapi.responses import HTMLResponse
-                try:
-                    with open('templates/key_error.html', 'r', encoding='utf-8') as f:
-                        error_html = f.read()
-                    return HTMLResponse(content=error_html, status_code=401)
-                except FileNotFoundError:
-                    return HTMLResponse(
-                        content="<h1>安全验证失败</h1><p>key丢失或无效，请通过正确的链接重新访问</p>",
-                        status_code=401
-                    )
+            return HTMLResponse(content=_load_key_error_html(), status_code=401)
         
         response = await call_next(request)
         return response
@@ -72,12 +93,14 @@ from config import WEB_CONFIG
 from services.config_manager import config_manager
 from services.machine_manager import machine_manager
 from api.machine_api import router as machine_router
+from database.connection import async_db_manager
 
 # 创建FastAPI应用
 app = FastAPI(
     title="无人机快递柜控制系统API",
     description="提供无人机快递柜的完整控制接口",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # 添加安全校验中间件
@@ -101,6 +124,22 @@ templates = Jinja2Templates(directory="templates")
 # 注册机器管理路由
 app.include_router(machine_router)
 
+@app.on_event("startup")
+async def init_async_db_pool():
+    """初始化异步数据库连接池"""
+    try:
+        await async_db_manager.init()
+    except Exception as e:
+        logger.error(f"初始化异步数据库连接池失败: {e}")
+
+@app.on_event("shutdown")
+async def close_async_db_pool():
+    """关闭异步数据库连接池"""
+    try:
+        await async_db_manager.close()
+    except Exception as e:
+        logger.error(f"关闭异步数据库连接池失败: {e}")
+
 # 请求模型定义
 class DoorOperationRequest(BaseModel):
     """舱门操作请求模型"""
@@ -140,12 +179,20 @@ class ApiResponse(BaseModel):
     success: bool
     message: str
     data: Optional[Dict[str, Any]] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = ''
+
+# 时间戳缓存：isoformat字符串最多每50ms生成一次，高QPS下省掉
+# 每次响应的datetime.now()加格式化开销
+_ts_cache = {"t": 0.0, "s": ""}
 
 # 工具函数
 def create_response(success: bool, message: str, data: Optional[Dict[str, Any]] = None) -> ApiResponse:
     """创建标准API响应"""
-    return ApiResponse(success=success, message=message, data=data)
+    now = time.monotonic()
+    if now - _ts_cache["t"] > 0.05:
+        _ts_cache["s"] = datetime.now().isoformat()
+        _ts_cache["t"] = now
+    return ApiResponse(success=success, message=message, data=data, timestamp=_ts_cache["s"])
 
 def get_machine_connection(machine_name: Optional[str] = None):
     """获取机器连接"""
@@ -181,14 +228,13 @@ async def validate_security_key(machine_name: str, key_value: str):
     """验证安全校验key并重定向到机器控制页面"""
     try:
         # 验证key是否在配置的有效key集合中
-        if key_value not in valid_keys:
-            logger.warning(f"无效的安全key: {key_value} for machine: {machine_name}")
+        if not is_valid_key(key_value):
+            logger.warning("无效的安全key: {} for machine: {}", key_value, machine_name)
             raise HTTPException(status_code=401, detail="无效的安全key")
-        
-        logger.info(f"安全key验证成功: {key_value} for machine: {machine_name}")
-        
+
+        logger.debug("安全key验证成功: {} for machine: {}", key_value, machine_name)
+
         # 重定向到机器控制页面，并在URL中包含key
-        from fastapi.responses import RedirectResponse
         return RedirectResponse(url=f"/machine/{machine_name}?key={key_value}")
     except HTTPException:
         raise
@@ -1245,6 +1291,34 @@ async def get_storage_capacity():
         logger.error(f"获取存储容量失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _tail_log_bytes(n: int = 1_048_576) -> bytes:
+    """读取日志文件末尾n字节
+
+    seek到文件尾部再读，内存占用与日志文件大小无关；截断处的
+    半行被丢弃，返回内容从完整一行开始。
+    """
+    path = LOG_CONFIG['file']
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size <= n:
+            return f.read()
+        f.seek(size - n)
+        data = f.read(n)
+    newline = data.find(b'\n')
+    return data[newline + 1:] if newline != -1 else data
+
+@app.get("/api/system/log")
+async def get_system_log(limit_bytes: int = Query(1_048_576, ge=1, le=10_485_760, description="返回的末尾字节数")):
+    """获取日志文件尾部"""
+    try:
+        data = _tail_log_bytes(limit_bytes)
+        return PlainTextResponse(data.decode('utf-8', errors='replace'))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="日志文件不存在")
+    except Exception as e:
+        logger.error(f"读取日志失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # 舱门控制接口
 @app.post("/api/door/operate", response_model=ApiResponse)
 async def operate_door(request: DoorOperationRequest):
@@ -1850,14 +1924,28 @@ async def health_check():
 # 启动函数
 def start_web_server():
     """启动Web服务器"""
-    logger.info(f"启动Web API服务器，端口: {WEB_CONFIG['port']}")
-    
-    uvicorn.run(
-        app,
-        host=WEB_CONFIG['host'],
-        port=WEB_CONFIG['port'],
-        log_level="info"
-    )
+    workers = WEB_CONFIG.get('workers', 1)
+    logger.info(f"启动Web API服务器，端口: {WEB_CONFIG['port']}，工作进程数: {workers}")
+
+    if workers > 1:
+        # 多进程模式需要以导入字符串方式传入应用
+        uvicorn.run(
+            "web_api:app",
+            host=WEB_CONFIG['host'],
+            port=WEB_CONFIG['port'],
+            workers=workers,
+            loop="auto",
+            log_level="info"
+        )
+    else:
+        # loop="auto"：安装了uvloop时自动启用（libuv事件循环，socket I/O约快一倍）
+        uvicorn.run(
+            app,
+            host=WEB_CONFIG['host'],
+            port=WEB_CONFIG['port'],
+            loop="auto",
+            log_level="info"
+        )
 
 if __name__ == "__main__":
     start_web_server()
\ No newline at end of file